@@ -0,0 +1,159 @@
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from validator import Validator
+
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'benchmarks.json')
+
+RULES = {
+    'required': ({'field': 'value'}, {'field': ''}),
+    'email': ({'field': 'mail@mail.com'}, {'field': 'mail@mail'}),
+    'numeric': ({'field': '-123.321'}, {'field': '123value'}),
+    'in:9,7,3,45': ({'field': '3'}, {'field': '4'}),
+    'max:10': ({'field': 5}, {'field': 15}),
+    'min:10': ({'field': 15}, {'field': 5}),
+    'not_in:9,7,3,45': ({'field': '4'}, {'field': '3'}),
+    'boolean': ({'field': '1'}, {'field': 'yes'}),
+    'lt:other': ({'field': 1, 'other': 2}, {'field': 3, 'other': 2}),
+    'lte:other': ({'field': 2, 'other': 2}, {'field': 3, 'other': 2}),
+    'gt:other': ({'field': 3, 'other': 2}, {'field': 1, 'other': 2}),
+    'gte:other': ({'field': 2, 'other': 2}, {'field': 1, 'other': 2}),
+}
+
+FORM_RULE = 'required|numeric|min:1|max:255|not_in:13,666'
+
+
+def measure(func, number, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    return number / best
+
+
+def form(fieldcount, failing=0):
+    rules = {'field%d' % index: FORM_RULE for index in range(fieldcount)}
+    data = {'field%d' % index: 'abc' if index < failing else 42 for index in range(fieldcount)}
+    return data, rules
+
+
+def bench_rules(number):
+    results = {}
+    for rule, samples in RULES.items():
+        rules = {'field': rule}
+        name = rule.split(':')[0]
+
+        for label, data in zip(('valid', 'invalid'), samples):
+            results['rule.%s.%s' % (name, label)] = measure(lambda: Validator(data, rules).valid(), number)
+
+        records = [samples[index % 2] for index in range(number)]
+        results['rule.%s.batch' % name] = measure(lambda: Validator.validate_many(records, rules), 1) * number
+
+    return results
+
+
+def bench_parse(number):
+    results = {}
+    for fieldcount in (1, 10, 50, 100):
+        data, rules = form(fieldcount)
+        results['parse.fields_%d' % fieldcount] = measure(lambda: Validator(data, rules), max(1, number // fieldcount))
+
+    return results
+
+
+def bench_valid(number):
+    results = {}
+    fieldcount = 20
+    for ratio in (0, 50, 100):
+        data, rules = form(fieldcount, failing=fieldcount * ratio // 100)
+        schema = Validator.compile(rules)
+        results['valid.failing_%d' % ratio] = measure(lambda: schema.validate(data).valid(), max(1, number // fieldcount))
+
+    return results
+
+
+def bench_memory(count=1000):
+    data, rules = form(10)
+    schema = Validator.compile(rules)
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    validators = [schema.validate(data) for _ in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    del validators
+    return {'memory.validator_10_fields_bytes': (after - before) / count}
+
+
+def run(number):
+    results = {}
+    results.update(bench_rules(number))
+    results.update(bench_parse(number))
+    results.update(bench_valid(number))
+    results.update(bench_memory())
+    return results
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    for name, value in sorted(results.items()):
+        if name not in baseline:
+            continue
+
+        # throughput should not drop, memory should not grow
+        if name.startswith('memory.'):
+            change = (value - baseline[name]) / baseline[name]
+        else:
+            change = (baseline[name] - value) / baseline[name]
+
+        if change > threshold:
+            regressions.append((name, baseline[name], value, change))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark the validator rules and the Validator itself.')
+    parser.add_argument('--number', type=int, default=2000, help='iterations per measurement')
+    parser.add_argument('--baseline', default=BASELINE, help='baseline file (default: %(default)s)')
+    parser.add_argument('--save', action='store_true', help='store the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help='relative slowdown reported as a regression (default: %(default)s)')
+    args = parser.parse_args(argv)
+
+    results = run(args.number)
+    for name, value in sorted(results.items()):
+        unit = 'bytes' if name.startswith('memory.') else 'ops/s'
+        print('%-40s %14.1f %s' % (name, value, unit))
+
+    if args.save:
+        with open(args.baseline, 'w') as handle:
+            json.dump(results, handle, indent=2, sort_keys=True)
+            handle.write('\n')
+        return 0
+
+    if not os.path.exists(args.baseline):
+        return 0
+
+    with open(args.baseline) as handle:
+        baseline = json.load(handle)
+
+    regressions = compare(results, baseline, args.threshold)
+    for name, before, after, change in regressions:
+        print('REGRESSION %s: %.1f -> %.1f (%.0f%% worse)' % (name, before, after, change * 100))
+
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
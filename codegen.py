@@ -0,0 +1,202 @@
+import math
+
+from fields import BUILTIN_FIELDS, EMAIL_PATTERN, NUMERIC_PATTERN
+from helpers import Path, is_hashable
+from unique import get_backend
+from validator import Validator, Schema
+
+
+COMPARISONS = {
+    Validator.RULE_LT: ('<', 'less than'),
+    Validator.RULE_LTE: ('<=', 'less than or equal'),
+    Validator.RULE_GT: ('>', 'greater than'),
+    Validator.RULE_GTE: ('>=', 'greater than or equal'),
+}
+
+WILDCARD_NAME = '\x00'
+
+
+def compile_function(rules, messages={}, bail=False, stop_on_first_error=False):
+    schema = rules if isinstance(rules, Schema) else Validator.compile(rules, messages)
+    source, namespace = generate_source(schema, bail, stop_on_first_error)
+
+    exec(compile(source, '<pyvalidator>', 'exec'), namespace)
+
+    function = namespace['validate']
+    function.source = source
+    return function
+
+
+def generate_source(schema, bail=False, stop_on_first_error=False):
+    generator = _Generator(bail, stop_on_first_error)
+    for fieldname, specs in schema.fields:
+        generator.field(fieldname, specs, bail or fieldname in schema.bail)
+
+    return generator.source(), generator.namespace
+
+
+class _Generator:
+    def __init__(self, bail, stop_on_first_error):
+        self.stop_on_first_error = stop_on_first_error
+        self.fieldname = None
+        self.namespace = {'EMAIL': EMAIL_PATTERN.match, 'NUMERIC': NUMERIC_PATTERN.match, 'BACKEND': get_backend,
+                          'HASHABLE': is_hashable}
+        self.lines = ['def validate(data):', '    errors = {}']
+
+    def source(self):
+        return '\n'.join(self.lines + ['    return not errors, errors', ''])
+
+    def constant(self, value):
+        if isinstance(value, (str, int)) or isinstance(value, float) and math.isfinite(value):
+            return repr(value)
+
+        return self.reference(value)
+
+    def reference(self, value):
+        name = 'CONST%d' % len(self.namespace)
+        self.namespace[name] = value
+        return name
+
+    def field(self, fieldname, specs, bail):
+        path = Path(fieldname)
+        self.fieldname = fieldname
+        indent = 1
+
+        self.emit(indent, '')
+        if path.wildcard:
+            # the field is named after a placeholder swapped for each concrete name
+            self.emit(indent, 'for name, value in %s.expand(data):' % self.constant(path))
+            indent += 1
+            key = 'name'
+            fieldname = WILDCARD_NAME
+        elif path.simple:
+            key = self.constant(fieldname)
+            self.emit(indent, 'value = data[%s] if %s in data else None' % (key, key))
+        else:
+            key = self.constant(fieldname)
+            self.emit(indent, 'value = %s.get(data)' % self.constant(path))
+
+        for index, (rule, rulevalue, message) in enumerate(specs):
+            field = Validator._make_field(fieldname, rule, rulevalue, message)
+
+            # with bail the remaining rules of the field only run while it is valid
+            if bail and index:
+                self.emit(indent, 'else:')
+                indent += 1
+
+            # only built-in rules are inlined, registered ones (also those
+            # replacing a built-in name) call the rule object itself
+            if type(field) is BUILTIN_FIELDS.get(rule):
+                emitter = getattr(self, 'rule_%s' % rule)
+            else:
+                emitter = self.rule_check
+            for line in emitter(field, rule):
+                self.emit(indent, line)
+
+            error = self.constant(field._invoke_error())
+            if path.wildcard:
+                error = '%s.replace(%r, name)' % (error, WILDCARD_NAME)
+            if emitter == self.rule_callback:
+                error = 'result if isinstance(result, str) else %s' % error
+            elif emitter == self.rule_check:
+                error = 'result if isinstance(result, str) and result is not %s else %s' \
+                        % (self.reference(field._invoke_error()), error)
+
+            self.emit(indent, 'if not ok:')
+            self.emit(indent + 1, 'errors.setdefault(%s, []).append(%s)' % (key, error))
+            if self.stop_on_first_error:
+                self.emit(indent + 1, 'return False, errors')
+
+    def emit(self, indent, line):
+        self.lines.append('    ' * indent + line if line else '')
+
+    def rule_required(self, field, rule):
+        return ["ok = not (value == '' or value is None or isinstance(value, (list, tuple, set)) and not value)"]
+
+    def rule_email(self, field, rule):
+        return ["ok = not value or '@' in value and EMAIL(value) is not None"]
+
+    def rule_numeric(self, field, rule):
+        return [
+            'kind = type(value)',
+            'ok = kind is int or kind is float and 1e-4 <= abs(value) < 1e16 \\',
+            '    or not (value and not isinstance(value, (str, int, float)) or value and not NUMERIC(str(value)))',
+        ]
+
+    def rule_in(self, field, rule):
+        return ['kind = type(value)', 'ok = %s or value == \'\' or value is None' % self.membership(field)]
+
+    def rule_not_in(self, field, rule):
+        return ['kind = type(value)', 'ok = not %s or value == \'\' or value is None' % self.membership(field)]
+
+    def membership(self, field):
+        enum = field.get_enum()
+        return '(value in %s if kind is int else value in %s if kind is float and value and value == value ' \
+               'else str(value) in %s)' % (self.constant(enum.ints), self.constant(enum.floats), self.constant(enum.strings))
+
+    def rule_max(self, field, rule):
+        return self.size(field, '<=')
+
+    def rule_min(self, field, rule):
+        return self.size(field, '>=')
+
+    def size(self, field, operator):
+        limit = self.constant(field.get_value())
+        return [
+            'if value is None:',
+            '    ok = True',
+            'elif isinstance(value, (str, list, tuple, set)):',
+            '    ok = len(value) %s %s' % (operator, limit),
+            'elif isinstance(value, (int, float)):',
+            '    ok = value %s %s' % (operator, limit),
+            'else:',
+            '    ok = False',
+        ]
+
+    def rule_boolean(self, field, rule):
+        return ["ok = value in (True, False, 0, 1, '0', '1', '', None)"]
+
+    def comparison(self, field, rule):
+        operator, description = COMPARISONS[rule]
+        error = 'The two values in a "%s" comparison must be of the same type. Found %%s and %%s.' % description
+        return [
+            self.other(field.get_value()),
+            'if isinstance(value, (list, tuple, set)) and not isinstance(other, (list, tuple, set)) \\',
+            '        or isinstance(value, (int, float)) and not isinstance(other, (int, float)) \\',
+            '        or not isinstance(value, (list, tuple, set, int, float)) and type(value) != type(other):',
+            '    raise ValueError(%s %% (value.__class__.__name__, other.__class__.__name__))' % self.constant(error),
+            'if isinstance(value, (str, list, tuple, set)):',
+            '    ok = len(value) %s len(other)' % operator,
+            'elif isinstance(value, (int, float)):',
+            '    ok = value %s other' % operator,
+            'else:',
+            '    ok = False',
+        ]
+
+    rule_lt = rule_lte = rule_gt = rule_gte = comparison
+
+    def other(self, othername):
+        path = Path(othername)
+        if path.simple:
+            return 'other = data[%s]' % self.constant(othername)
+
+        return 'other = %s.resolve(data)' % self.constant(path)
+
+    def rule_callback(self, field, rule):
+        if field.is_async:
+            raise TypeError('Field %s has an async rule, which cannot be compiled into a function' % field.fieldname)
+
+        return ['result = %s(value, data)' % self.constant(field.get_callback()), 'ok = result is True']
+
+    def rule_check(self, field, rule):
+        if field.is_async:
+            raise TypeError('Field %s has an async rule, which cannot be compiled into a function' % field.fieldname)
+
+        return ['result = %s.check(value, data)' % self.constant(field), 'ok = result is True']
+
+    def rule_unique(self, field, rule):
+        # a wildcard field is built under a placeholder, its column comes from the real name
+        table, column = field.get_value()[0], field.get_column(self.fieldname)
+        return ["ok = value == '' or value is None \\",
+                "    or HASHABLE(value) and value not in BACKEND().existing(%s, %s, (value,))"
+                % (self.constant(table), self.constant(column))]
@@ -1,92 +1,188 @@
+import inspect
+import operator
 import re
-from helpers import is_str, is_numeric, is_iterable
+from helpers import is_str, is_numeric, is_iterable, is_hashable, parse_template, render_template, EnumValues, Path
+from unique import get_backend
+
+
+EMAIL_PATTERN = re.compile(r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)")
+NUMERIC_PATTERN = re.compile(r"^-?([1-9]+[0-9]*|([0-9]*\.[0-9]+))(e([1-9]+)|e\+([1-9]+)|e-([1-9]+))?$")
 
 
 class ValidationField:
-    def __init__(self, fieldname, value, message=None, _validator=None):
+    __slots__ = ('fieldname', 'message', '_error')
+
+    rule = None
+    is_async = False
+    coerces = False
+    cacheable = False
+
+    def __init__(self, fieldname, message=None):
         self.fieldname = fieldname
-        self.value = value
         self.message = message
-        classname = self.__class__.__name__.lower().replace('field', '')
-        self.rule = classname
-        self._validator = _validator
+        self._error = message
 
-        if message is not None:
-            self.message = message
-        else:
-            self.construct_message()
-            pass
+    @classmethod
+    def create(cls, fieldname, rulevalue=None, message=None):
+        field = cls(fieldname, message)
+        field.set_rule_value(rulevalue)
+        return field
+
+    def set_rule_value(self, rulevalue):
+        pass
 
-    def construct_message(self):
+    def construct_message(self, fieldname=None):
         if hasattr(self, 'Meta') and hasattr(self.Meta, 'message'):
-            self.message = self.Meta.message.replace('{#fieldname#}', self.fieldname)
+            placeholders = self.placeholders()
+            if fieldname is not None:
+                placeholders['fieldname'] = fieldname
+            return render_template(parse_template(self.Meta.message), placeholders)
+
+    def placeholders(self):
+        return {'fieldname': self.fieldname}
 
     def _invoke_error(self):
-        return self.message
+        if self._error is None:
+            self._error = self.construct_message()
+        return self._error
 
-    def validate(self):
+    def error_for(self, fieldname):
+        # a wildcard field fails under the concrete names of its items
+        if self.message is not None or fieldname == self.fieldname:
+            return self._invoke_error()
+        return self.construct_message(fieldname)
+
+    def check(self, value, data):
         pass
 
+    def check_column(self, values, rows):
+        return [self.check(value, data) for value, data in zip(values, rows)]
+
+    def check_coerce(self, value, data):
+        return self.check(value, data), value
+
+    def params(self):
+        return ()
+
 
 class RequiredField(ValidationField):
+    __slots__ = ()
+
+    rule = 'required'
+
     class Meta:
         message = 'Field {#fieldname#} is required'
 
-    def validate(self):
-        if self.value == '' or self.value is None or isinstance(self.value, (list, tuple, set)) and not self.value:
+    def check(self, value, data):
+        if value == '' or value is None or isinstance(value, (list, tuple, set)) and not value:
             return self._invoke_error()
         return True
 
 
 class EmailField(ValidationField):
+    __slots__ = ()
+
+    rule = 'email'
+    cacheable = True
+
     class Meta:
         message = 'Field {#fieldname#} is not a valid email address'
 
-    def validate(self):
-        if self.value and not re.match(r"(^[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+$)", self.value):
+    def check(self, value, data):
+        if value and ('@' not in value or not EMAIL_PATTERN.match(value)):
             return self._invoke_error()
         return True
 
 
 class NumericField(ValidationField):
+    __slots__ = ()
+
+    rule = 'numeric'
+    coerces = True
+    cacheable = True
+
     class Meta:
         message = 'Field {#fieldname#} accepts numbers only'
 
-    def validate(self):
-        if self.value and not re.match(r"^-?([1-9]+[0-9]*|([0-9]*\.[0-9]+))(e([1-9]+)|e\+([1-9]+)|e-([1-9]+))?$", str(self.value))\
-                or self.value and not isinstance(self.value, (str, int, float)):
+    def check(self, value, data):
+        # str() of any int, and of any float in this range, is a plain number
+        # the pattern accepts, so those skip the conversion and the regex
+        kind = type(value)
+        if kind is int or kind is float and 1e-4 <= abs(value) < 1e16:
+            return True
+
+        if value and not isinstance(value, (str, int, float)) \
+                or value and not NUMERIC_PATTERN.match(str(value)):
             return self._invoke_error()
         return True
 
+    def check_coerce(self, value, data):
+        kind = type(value)
+        if kind is int or kind is float and 1e-4 <= abs(value) < 1e16 or not value:
+            return True, value
+
+        match = NUMERIC_PATTERN.match(str(value)) if isinstance(value, (str, int, float)) else None
+        if match is None:
+            return self._invoke_error(), value
+        elif kind is not str:
+            return True, value
+
+        # the match tells whether the string holds a whole number
+        if match.group(2) is None and match.group(3) is None:
+            return True, int(value)
+        return True, float(value)
+
 
 class InField(ValidationField):
+    __slots__ = ('_values',)
+
+    rule = 'in'
+
     class Meta:
         message = 'Field {#fieldname#} accepts only these values: {#values#}'
-        values = []
+
+    def __init__(self, fieldname, message=None):
+        self._values = EnumValues(())
+        super(InField, self).__init__(fieldname, message)
+
+    def set_rule_value(self, rulevalue):
+        self.set_values(rulevalue)
 
     def set_values(self, values):
-        self.Meta.values = values
-        self.construct_message()
+        self._values = EnumValues(values)
 
     def get_values(self):
-        return self.Meta.values
+        return self._values.values
 
-    def construct_message(self):
-        if hasattr(self, 'Meta') and hasattr(self.Meta, 'message'):
-            super(InField, self).construct_message()
-            self.message = self.message.replace('{#values#}', ', '.join(self.get_values()))
+    def get_enum(self):
+        return self._values
+
+    def placeholders(self):
+        placeholders = super(InField, self).placeholders()
+        placeholders['values'] = ', '.join(self.get_values())
+        return placeholders
 
-    def validate(self):
-        if str(self.value) in self.get_values() or self.value == '' or self.value is None:
+    def check(self, value, data):
+        if value in self._values or value == '' or value is None:
             return True
 
         return self._invoke_error()
 
 
 class MaxField(ValidationField):
+    __slots__ = ('_param',)
+
+    rule = 'max'
+
     class Meta:
         message = 'Field {#fieldname#} has a maximum of: {#value#}'
-        value = None
+
+    def __init__(self, fieldname, message=None):
+        self._param = None
+        super(MaxField, self).__init__(fieldname, message)
+
+    def set_rule_value(self, rulevalue):
+        self.set_value(rulevalue)
 
     def set_value(self, value):
         isstr = isinstance(value, str)
@@ -98,35 +194,44 @@ class MaxField(ValidationField):
             except ValueError:
                 raise ValueError('Value supplied to the "max" rule must be of type int or float')
 
-        self.Meta.value = value
-        self.construct_message()
+        self._param = value
 
     def get_value(self):
-        return self.Meta.value
+        return self._param
 
-    def construct_message(self):
-        if hasattr(self, 'Meta') and hasattr(self.Meta, 'message'):
-            super(MaxField, self).construct_message()
-            self.message = self.message.replace('{#value#}', str(self.get_value()))
+    def placeholders(self):
+        placeholders = super(MaxField, self).placeholders()
+        placeholders['value'] = str(self.get_value())
+        return placeholders
 
-    def validate(self):
-        if self.value is None:
+    def check(self, value, data):
+        if value is None:
             return True
 
-        if isinstance(self.value, (str, list, tuple, set)):
-            if len(self.value) <= self.get_value():
+        if isinstance(value, (str, list, tuple, set)):
+            if len(value) <= self.get_value():
                 return True
-        elif isinstance(self.value, (int, float)):
-            if self.value <= self.get_value():
+        elif isinstance(value, (int, float)):
+            if value <= self.get_value():
                 return True
 
         return self._invoke_error()
 
 
 class MinField(ValidationField):
+    __slots__ = ('_param',)
+
+    rule = 'min'
+
     class Meta:
         message = 'Field {#fieldname#} has a minimum of: {#value#}'
-        value = None
+
+    def __init__(self, fieldname, message=None):
+        self._param = None
+        super(MinField, self).__init__(fieldname, message)
+
+    def set_rule_value(self, rulevalue):
+        self.set_value(rulevalue)
 
     def set_value(self, value):
         isstr = isinstance(value, str)
@@ -138,205 +243,462 @@ class MinField(ValidationField):
             except ValueError:
                 raise ValueError('Value supplied to the "min" rule must be of type int or float')
 
-        self.Meta.value = value
-        self.construct_message()
+        self._param = value
 
     def get_value(self):
-        return self.Meta.value
+        return self._param
 
-    def construct_message(self):
-        if hasattr(self, 'Meta') and hasattr(self.Meta, 'message'):
-            super(MinField, self).construct_message()
-            self.message = self.message.replace('{#value#}', str(self.get_value()))
+    def placeholders(self):
+        placeholders = super(MinField, self).placeholders()
+        placeholders['value'] = str(self.get_value())
+        return placeholders
 
-    def validate(self):
-        if self.value is None:
+    def check(self, value, data):
+        if value is None:
             return True
 
-        if isinstance(self.value, (str, list, tuple, set)):
-            if len(self.value) >= self.get_value():
+        if isinstance(value, (str, list, tuple, set)):
+            if len(value) >= self.get_value():
                 return True
-        elif isinstance(self.value, (int, float)):
-            if self.value >= self.get_value():
+        elif isinstance(value, (int, float)):
+            if value >= self.get_value():
                 return True
 
         return self._invoke_error()
 
 
 class NotInField(ValidationField):
+    __slots__ = ('_values',)
+
+    rule = 'not_in'
+
     class Meta:
         message = 'Field {#fieldname#} must not be one of these values: {#values#}'
-        values = []
+
+    def __init__(self, fieldname, message=None):
+        self._values = EnumValues(())
+        super(NotInField, self).__init__(fieldname, message)
+
+    def set_rule_value(self, rulevalue):
+        self.set_values(rulevalue)
 
     def set_values(self, values):
-        self.Meta.values = values
-        self.construct_message()
+        self._values = EnumValues(values)
 
     def get_values(self):
-        return self.Meta.values
+        return self._values.values
 
-    def construct_message(self):
-        if hasattr(self, 'Meta') and hasattr(self.Meta, 'message'):
-            super(NotInField, self).construct_message()
-            self.message = self.message.replace('{#values#}', ', '.join(self.get_values()))
+    def get_enum(self):
+        return self._values
 
-    def validate(self):
-        if str(self.value) not in self.get_values() or self.value == '' or self.value is None:
+    def placeholders(self):
+        placeholders = super(NotInField, self).placeholders()
+        placeholders['values'] = ', '.join(self.get_values())
+        return placeholders
+
+    def check(self, value, data):
+        if value not in self._values or value == '' or value is None:
             return True
 
         return self._invoke_error()
 
 
 class BooleanField(ValidationField):
+    __slots__ = ()
+
+    rule = 'boolean'
+    coerces = True
+
     class Meta:
         message = 'Field {#fieldname#} must be one of these values: True, False, 0, 1, "0" or "1"'
 
-    def validate(self):
-        if self.value in (True, False, 0, 1, '0', '1', '', None):
+    def check(self, value, data):
+        if value in (True, False, 0, 1, '0', '1', '', None):
             return True
 
         return self._invoke_error()
 
+    def check_coerce(self, value, data):
+        if value == '' or value is None:
+            return True, value
+        elif value in (True, False, 0, 1):
+            return True, bool(value)
+        elif value in ('0', '1'):
+            return True, value == '1'
+
+        return self._invoke_error(), value
+
 
 class LessThanField(ValidationField):
+    __slots__ = ('_param', '_path')
+
+    rule = 'lt'
+
     class Meta:
         message = 'Field {#fieldname#} must be less than the field {#otherfieldname#} in size'
-        value = None
+
+    def __init__(self, fieldname, message=None):
+        self._param = None
+        self._path = None
+        super(LessThanField, self).__init__(fieldname, message)
+
+    def set_rule_value(self, rulevalue):
+        self.set_value(rulevalue)
 
     def set_value(self, value):
-        self.Meta.value = value
-        self.construct_message()
+        self._param = value
+        self._path = Path(value)
 
     def get_value(self):
-        return self.Meta.value
+        return self._param
 
-    def construct_message(self):
-        if hasattr(self, 'Meta') and hasattr(self.Meta, 'message'):
-            super(LessThanField, self).construct_message()
-            self.message = self.message.replace('{#otherfieldname#}', str(self.get_value()))
+    def placeholders(self):
+        placeholders = super(LessThanField, self).placeholders()
+        placeholders['otherfieldname'] = str(self.get_value())
+        return placeholders
 
-    def validate(self):
-        othervalue = self._validator.data[self.get_value()]
+    def check(self, value, data):
+        othervalue = self._path.resolve(data)
 
-        if is_iterable(self.value) and not is_iterable(othervalue) \
-            or is_numeric(self.value) and not is_numeric(othervalue) \
-                or not is_iterable(self.value) and not is_numeric(self.value) and type(self.value) != type(othervalue):
+        if is_iterable(value) and not is_iterable(othervalue) \
+            or is_numeric(value) and not is_numeric(othervalue) \
+                or not is_iterable(value) and not is_numeric(value) and type(value) != type(othervalue):
             raise ValueError('The two values in a "less than" comparison must be of the same type. Found %s and %s.' %
-                             (self.value.__class__.__name__, othervalue.__class__.__name__))
+                             (value.__class__.__name__, othervalue.__class__.__name__))
 
-        if is_str(self.value) or is_iterable(self.value):
-            if len(self.value) < len(othervalue):
+        if is_str(value) or is_iterable(value):
+            if len(value) < len(othervalue):
                 return True
-        elif is_numeric(self.value):
-            if self.value < othervalue:
+        elif is_numeric(value):
+            if value < othervalue:
                 return True
 
         return self._invoke_error()
 
+    def check_column(self, values, rows, othervalues=None):
+        if othervalues is None:
+            othervalues = [self._path.resolve(data) for _, data in zip(values, rows)]
+
+        return compare_columns(self, values, othervalues, operator.lt, 'less than')
+
 
 class LessThanEqualField(ValidationField):
+    __slots__ = ('_param', '_path')
+
+    rule = 'lte'
+
     class Meta:
         message = 'Field {#fieldname#} must be less than or equal to the field {#otherfieldname#} in size'
-        value = None
+
+    def __init__(self, fieldname, message=None):
+        self._param = None
+        self._path = None
+        super(LessThanEqualField, self).__init__(fieldname, message)
+
+    def set_rule_value(self, rulevalue):
+        self.set_value(rulevalue)
 
     def set_value(self, value):
-        self.Meta.value = value
-        self.construct_message()
+        self._param = value
+        self._path = Path(value)
 
     def get_value(self):
-        return self.Meta.value
+        return self._param
 
-    def construct_message(self):
-        if hasattr(self, 'Meta') and hasattr(self.Meta, 'message'):
-            super(LessThanEqualField, self).construct_message()
-            self.message = self.message.replace('{#otherfieldname#}', str(self.get_value()))
+    def placeholders(self):
+        placeholders = super(LessThanEqualField, self).placeholders()
+        placeholders['otherfieldname'] = str(self.get_value())
+        return placeholders
 
-    def validate(self):
-        othervalue = self._validator.data[self.get_value()]
+    def check(self, value, data):
+        othervalue = self._path.resolve(data)
 
-        if is_iterable(self.value) and not is_iterable(othervalue) \
-            or is_numeric(self.value) and not is_numeric(othervalue) \
-                or not is_iterable(self.value) and not is_numeric(self.value) and type(self.value) != type(othervalue):
+        if is_iterable(value) and not is_iterable(othervalue) \
+            or is_numeric(value) and not is_numeric(othervalue) \
+                or not is_iterable(value) and not is_numeric(value) and type(value) != type(othervalue):
             raise ValueError('The two values in a "less than or equal" comparison must be of the same type. Found %s and %s.' %
-                             (self.value.__class__.__name__, othervalue.__class__.__name__))
+                             (value.__class__.__name__, othervalue.__class__.__name__))
 
-        if is_str(self.value) or is_iterable(self.value):
-            if len(self.value) <= len(othervalue):
+        if is_str(value) or is_iterable(value):
+            if len(value) <= len(othervalue):
                 return True
-        elif is_numeric(self.value):
-            if self.value <= othervalue:
+        elif is_numeric(value):
+            if value <= othervalue:
                 return True
 
         return self._invoke_error()
 
+    def check_column(self, values, rows, othervalues=None):
+        if othervalues is None:
+            othervalues = [self._path.resolve(data) for _, data in zip(values, rows)]
+
+        return compare_columns(self, values, othervalues, operator.le, 'less than or equal')
+
 
 class GreaterThanField(ValidationField):
+    __slots__ = ('_param', '_path')
+
+    rule = 'gt'
+
     class Meta:
         message = 'Field {#fieldname#} must be greater than the field {#otherfieldname#} in size'
-        value = None
+
+    def __init__(self, fieldname, message=None):
+        self._param = None
+        self._path = None
+        super(GreaterThanField, self).__init__(fieldname, message)
+
+    def set_rule_value(self, rulevalue):
+        self.set_value(rulevalue)
 
     def set_value(self, value):
-        self.Meta.value = value
-        self.construct_message()
+        self._param = value
+        self._path = Path(value)
 
     def get_value(self):
-        return self.Meta.value
+        return self._param
 
-    def construct_message(self):
-        if hasattr(self, 'Meta') and hasattr(self.Meta, 'message'):
-            super(GreaterThanField, self).construct_message()
-            self.message = self.message.replace('{#otherfieldname#}', str(self.get_value()))
+    def placeholders(self):
+        placeholders = super(GreaterThanField, self).placeholders()
+        placeholders['otherfieldname'] = str(self.get_value())
+        return placeholders
 
-    def validate(self):
-        othervalue = self._validator.data[self.get_value()]
+    def check(self, value, data):
+        othervalue = self._path.resolve(data)
 
-        if is_iterable(self.value) and not is_iterable(othervalue) \
-            or is_numeric(self.value) and not is_numeric(othervalue) \
-                or not is_iterable(self.value) and not is_numeric(self.value) and type(self.value) != type(othervalue):
+        if is_iterable(value) and not is_iterable(othervalue) \
+            or is_numeric(value) and not is_numeric(othervalue) \
+                or not is_iterable(value) and not is_numeric(value) and type(value) != type(othervalue):
             raise ValueError('The two values in a "greater than" comparison must be of the same type. Found %s and %s.' %
-                             (self.value.__class__.__name__, othervalue.__class__.__name__))
+                             (value.__class__.__name__, othervalue.__class__.__name__))
 
-        if is_str(self.value) or is_iterable(self.value):
-            if len(self.value) > len(othervalue):
+        if is_str(value) or is_iterable(value):
+            if len(value) > len(othervalue):
                 return True
-        elif is_numeric(self.value):
-            if self.value > othervalue:
+        elif is_numeric(value):
+            if value > othervalue:
                 return True
 
         return self._invoke_error()
 
+    def check_column(self, values, rows, othervalues=None):
+        if othervalues is None:
+            othervalues = [self._path.resolve(data) for _, data in zip(values, rows)]
+
+        return compare_columns(self, values, othervalues, operator.gt, 'greater than')
+
 
 class GreaterThanEqualField(ValidationField):
+    __slots__ = ('_param', '_path')
+
+    rule = 'gte'
+
     class Meta:
         message = 'Field {#fieldname#} must be greater than or equal to the field {#otherfieldname#} in size'
-        value = None
+
+    def __init__(self, fieldname, message=None):
+        self._param = None
+        self._path = None
+        super(GreaterThanEqualField, self).__init__(fieldname, message)
+
+    def set_rule_value(self, rulevalue):
+        self.set_value(rulevalue)
 
     def set_value(self, value):
-        self.Meta.value = value
-        self.construct_message()
+        self._param = value
+        self._path = Path(value)
 
     def get_value(self):
-        return self.Meta.value
+        return self._param
 
-    def construct_message(self):
-        if hasattr(self, 'Meta') and hasattr(self.Meta, 'message'):
-            super(GreaterThanEqualField, self).construct_message()
-            self.message = self.message.replace('{#otherfieldname#}', str(self.get_value()))
+    def placeholders(self):
+        placeholders = super(GreaterThanEqualField, self).placeholders()
+        placeholders['otherfieldname'] = str(self.get_value())
+        return placeholders
 
-    def validate(self):
-        othervalue = self._validator.data[self.get_value()]
+    def check(self, value, data):
+        othervalue = self._path.resolve(data)
 
-        if is_iterable(self.value) and not is_iterable(othervalue) \
-            or is_numeric(self.value) and not is_numeric(othervalue) \
-                or not is_iterable(self.value) and not is_numeric(self.value) and type(self.value) != type(othervalue):
+        if is_iterable(value) and not is_iterable(othervalue) \
+            or is_numeric(value) and not is_numeric(othervalue) \
+                or not is_iterable(value) and not is_numeric(value) and type(value) != type(othervalue):
             raise ValueError('The two values in a "greater than or equal" comparison must be of the same type. Found %s and %s.' %
-                             (self.value.__class__.__name__, othervalue.__class__.__name__))
+                             (value.__class__.__name__, othervalue.__class__.__name__))
 
-        if is_str(self.value) or is_iterable(self.value):
-            if len(self.value) >= len(othervalue):
+        if is_str(value) or is_iterable(value):
+            if len(value) >= len(othervalue):
                 return True
-        elif is_numeric(self.value):
-            if self.value >= othervalue:
+        elif is_numeric(value):
+            if value >= othervalue:
                 return True
 
         return self._invoke_error()
+
+    def check_column(self, values, rows, othervalues=None):
+        if othervalues is None:
+            othervalues = [self._path.resolve(data) for _, data in zip(values, rows)]
+
+        return compare_columns(self, values, othervalues, operator.ge, 'greater than or equal')
+
+
+class CallbackField(ValidationField):
+    __slots__ = ('_callback', 'is_async')
+
+    rule = 'callback'
+
+    class Meta:
+        message = 'Field {#fieldname#} is invalid'
+
+    def __init__(self, fieldname, message=None):
+        self._callback = None
+        self.is_async = False
+        super(CallbackField, self).__init__(fieldname, message)
+
+    def set_rule_value(self, rulevalue):
+        self.set_callback(rulevalue)
+
+    def set_callback(self, callback):
+        self._callback = callback
+        self.is_async = inspect.iscoroutinefunction(callback)
+
+    def get_callback(self):
+        return self._callback
+
+    def _result(self, result):
+        if result is True:
+            return True
+        elif is_str(result):
+            return result
+
+        return self._invoke_error()
+
+    def check(self, value, data):
+        if self.is_async:
+            raise TypeError('Field %s has an async rule, validate it with avalid()' % self.fieldname)
+
+        return self._result(self._callback(value, data))
+
+    async def acheck(self, value, data):
+        return self._result(await self._callback(value, data))
+
+
+class UniqueField(ValidationField):
+    __slots__ = ('_table', '_column')
+
+    rule = 'unique'
+
+    class Meta:
+        message = 'Field {#fieldname#} has already been taken'
+
+    def __init__(self, fieldname, message=None):
+        self._table = None
+        self._column = None
+        super(UniqueField, self).__init__(fieldname, message)
+
+    def set_rule_value(self, rulevalue):
+        self.set_value(rulevalue)
+
+    def set_value(self, value):
+        parts = [part.strip() for part in value.split(',')] if isinstance(value, str) else list(value)
+        if not parts or not parts[0]:
+            raise ValueError('The "unique" rule needs a table, e.g. unique:users,email')
+
+        self._table = parts[0]
+        self._column = parts[1] if len(parts) > 1 and parts[1] else None
+
+    def get_value(self):
+        return self._table, self.get_column()
+
+    def get_column(self, fieldname=None):
+        # the column defaults to the last named segment, 'items.*.sku' looks up 'sku'
+        if self._column:
+            return self._column
+
+        segments = [segment for segment in (fieldname or self.fieldname).split('.') if segment != '*']
+        return segments[-1] if segments else self.fieldname
+
+    def check(self, value, data):
+        if value == '' or value is None:
+            return True
+        elif not is_hashable(value):
+            # lists and dicts can never be looked up as a stored value
+            return self._invoke_error()
+
+        if value in get_backend().existing(self._table, self.get_column(), (value,)):
+            return self._invoke_error()
+        return True
+
+    def check_column(self, values, rows):
+        lookup = {value for value in values if value != '' and value is not None and is_hashable(value)}
+        existing = get_backend().existing(self._table, self.get_column(), lookup) if lookup else set()
+        seen = set()
+        checks = []
+
+        # one lookup for the whole column, repeated values within it are taken by their first row
+        for value in values:
+            if value == '' or value is None:
+                checks.append(True)
+            elif not is_hashable(value) or value in existing or value in seen:
+                checks.append(self._invoke_error())
+            else:
+                seen.add(value)
+                checks.append(True)
+
+        return checks
+
+
+COMPARISON_FIELDS = (LessThanField, LessThanEqualField, GreaterThanField, GreaterThanEqualField)
+
+BUILTIN_FIELDS = {fieldclass.rule: fieldclass for fieldclass in (
+    RequiredField, EmailField, NumericField, InField, MaxField, MinField, NotInField, BooleanField,
+    LessThanField, LessThanEqualField, GreaterThanField, GreaterThanEqualField, CallbackField, UniqueField,
+)}
+
+# callback fields are built from callables in rule lists only, a 'callback'
+# rule string is unknown like any other unregistered name
+RULE_FACTORIES = {rule: fieldclass.create for rule, fieldclass in BUILTIN_FIELDS.items()
+                  if fieldclass is not CallbackField}
+
+NUMERIC_TYPES = {int, float}
+ITERABLE_TYPES = {list, tuple, set}
+
+
+def compare_columns(field, values, othervalues, compare, description):
+    error = field._invoke_error()
+    types = set(map(type, values))
+    othertypes = set(map(type, othervalues))
+
+    # the types are checked once for the whole column when it is uniform,
+    # the rows are then only compared
+    if types <= NUMERIC_TYPES and othertypes <= NUMERIC_TYPES:
+        return [True if compare(value, othervalue) else error for value, othervalue in zip(values, othervalues)]
+    elif types <= {str} and othertypes <= {str} or types <= ITERABLE_TYPES and othertypes <= ITERABLE_TYPES:
+        return [True if compare(len(value), len(othervalue)) else error for value, othervalue in zip(values, othervalues)]
+
+    checks = []
+    for row, (value, othervalue) in enumerate(zip(values, othervalues)):
+        kind = _comparison_kind(value)
+        if kind != _comparison_kind(othervalue):
+            raise ValueError('The two values in a "%s" comparison must be of the same type. '
+                             'Field %s holds %s and field %s holds %s in row %d.' %
+                             (description, field.fieldname, value.__class__.__name__,
+                              field.get_value(), othervalue.__class__.__name__, row))
+
+        if kind is list or kind is str:
+            checks.append(True if compare(len(value), len(othervalue)) else error)
+        elif kind is int:
+            checks.append(True if compare(value, othervalue) else error)
+        else:
+            checks.append(error)
+
+    return checks
+
+
+def _comparison_kind(value):
+    # values of the same kind can be compared, iterables and numbers mix freely
+    if is_iterable(value):
+        return list
+    elif is_numeric(value):
+        return int
+
+    return type(value)
@@ -1,3 +1,12 @@
+import re
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+
+PLACEHOLDER_PATTERN = re.compile(r'\{#(\w+)#\}')
+
+
 def is_iterable(obj):
     return isinstance(obj, (list, tuple, set))
 
@@ -8,3 +17,217 @@ def is_str(obj):
 
 def is_numeric(obj):
     return isinstance(obj, (int, float))
+
+
+def is_hashable(obj):
+    try:
+        hash(obj)
+    except TypeError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=None)
+def parse_template(template):
+    return tuple(PLACEHOLDER_PATTERN.split(template))
+
+
+def render_template(parts, placeholders):
+    rendered = []
+    for index, part in enumerate(parts):
+        if index % 2:
+            rendered.append(placeholders[part] if part in placeholders else '{#%s#}' % part)
+        else:
+            rendered.append(part)
+
+    return ''.join(rendered)
+
+
+def read_values(source):
+    if is_str(source):
+        with open(source) as handle:
+            return read_values(handle)
+
+    return [value for value in (line.strip() for line in source) if value]
+
+
+class EnumValues:
+    __slots__ = ('values', 'strings', 'ints', 'floats')
+
+    def __init__(self, values):
+        self.values = tuple(value if is_str(value) else str(value) for value in values)
+        self.strings = frozenset(self.values)
+        ints = set()
+        floats = set()
+
+        # ints and floats are matched without str(), so only keep the values
+        # that str() of such a number would produce
+        for text in self.strings:
+            try:
+                number = int(text)
+                if str(number) == text:
+                    ints.add(number)
+            except ValueError:
+                pass
+
+            try:
+                number = float(text)
+                if str(number) == text and number and number == number:
+                    floats.add(number)
+            except ValueError:
+                pass
+
+        self.ints = frozenset(ints)
+        self.floats = frozenset(floats)
+
+    def __contains__(self, value):
+        kind = type(value)
+        if kind is int:
+            return value in self.ints
+        elif kind is float and value and value == value:
+            return value in self.floats
+
+        return str(value) in self.strings
+
+    def __len__(self):
+        return len(self.values)
+
+
+class LRUCache:
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                self.misses += 1
+                return default
+
+            self.hits += 1
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            if self.maxsize <= 0:
+                return
+
+            self._data[key] = value
+            self._data.move_to_end(key)
+            self._evict()
+
+    def resize(self, maxsize):
+        with self._lock:
+            self.maxsize = maxsize
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def info(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'size': len(self._data),
+                'maxsize': self.maxsize,
+            }
+
+    def _evict(self):
+        while len(self._data) > max(self.maxsize, 0):
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._data)
+
+
+class Path:
+    __slots__ = ('name', 'segments', 'simple', 'wildcard')
+
+    def __init__(self, name):
+        self.name = name
+        self.segments = tuple(name.split('.'))
+        self.simple = len(self.segments) == 1
+        self.wildcard = '*' in self.segments
+
+    def get(self, data, default=None):
+        if self.simple:
+            return data[self.name] if self.name in data else default
+
+        for segment in self.segments:
+            data = _step(data, segment)
+            if data is _MISSING:
+                return default
+
+        return data
+
+    def resolve(self, data):
+        value = self.get(data, _MISSING)
+        if value is _MISSING:
+            raise KeyError(self.name)
+
+        return value
+
+    def expand(self, data):
+        found = [('', data)]
+
+        for segment in self.segments:
+            step = []
+            for prefix, value in found:
+                if segment != '*':
+                    step.append((prefix + segment + '.', _step(value, segment)))
+                elif isinstance(value, dict):
+                    step.extend((prefix + str(key) + '.', item) for key, item in value.items())
+                elif isinstance(value, (list, tuple)):
+                    step.extend((prefix + str(index) + '.', item) for index, item in enumerate(value))
+            found = step
+
+        return [(prefix[:-1], None if value is _MISSING else value) for prefix, value in found]
+
+
+_MISSING = object()
+
+
+def assign(data, segments, value, copied):
+    # the dicts and lists along the path are copied the first time they are
+    # written to, so the data they came from is left untouched
+    for segment in segments[:-1]:
+        child = _step(data, segment)
+        if not isinstance(child, (dict, list)):
+            return
+
+        if id(child) not in copied:
+            child = dict(child) if isinstance(child, dict) else list(child)
+            copied.add(id(child))
+            _put(data, segment, child)
+        data = child
+
+    _put(data, segments[-1], value)
+
+
+def _put(data, segment, value):
+    if isinstance(data, dict):
+        data[segment] = value
+    else:
+        data[int(segment)] = value
+
+
+def _step(data, segment):
+    if isinstance(data, dict):
+        return data[segment] if segment in data else _MISSING
+    elif isinstance(data, (list, tuple)) and segment.isdigit():
+        index = int(segment)
+        return data[index] if index < len(data) else _MISSING
+
+    return _MISSING
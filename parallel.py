@@ -0,0 +1,63 @@
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from validator import Validator, Schema
+
+
+_schema = None
+_bail = False
+
+
+def validate_parallel(records, rules, messages={}, workers=None, chunk_size=10000, bail=False):
+    schema = rules if isinstance(rules, Schema) else Validator.compile(rules, messages)
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(records, chunk_size)
+    valid = []
+    errors = {}
+
+    def merge(result):
+        chunkvalid, chunkerrors = result
+        for index, rowerrors in chunkerrors.items():
+            errors[len(valid) + index] = rowerrors
+        valid.extend(chunkvalid)
+
+    if workers == 1:
+        for chunk in chunks:
+            merge(Validator.validate_many(chunk, schema, bail=bail))
+        return valid, errors
+
+    # the schema is sent once per worker process, only the chunks travel per task;
+    # a bounded number of chunks is in flight so the input is read lazily
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(schema, bail)) as executor:
+        pending = deque()
+
+        for chunk in chunks:
+            pending.append(executor.submit(_validate_chunk, chunk))
+            if len(pending) >= workers * 2:
+                merge(pending.popleft().result())
+
+        while pending:
+            merge(pending.popleft().result())
+
+    return valid, errors
+
+
+def _chunks(records, chunk_size):
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _init_worker(schema, bail):
+    global _schema, _bail
+    _schema = schema
+    _bail = bail
+
+
+def _validate_chunk(records):
+    return Validator.validate_many(records, _schema, bail=_bail)
@@ -0,0 +1,83 @@
+import threading
+
+
+collector = None
+
+
+def set_profiler(profiler):
+    global collector
+    collector = profiler
+
+
+def get_profiler():
+    return collector
+
+
+def record(samples, fieldname, rule, calls, failures, elapsed):
+    sample = samples.get((fieldname, rule))
+    if sample is None:
+        sample = samples[(fieldname, rule)] = [0, 0, 0.0]
+
+    sample[0] += calls
+    sample[1] += failures
+    sample[2] += elapsed
+
+
+class Profiler:
+    def __init__(self):
+        self._samples = {}
+        self._lock = threading.Lock()
+
+    def add(self, samples):
+        with self._lock:
+            for (fieldname, rule), (calls, failures, elapsed) in samples.items():
+                record(self._samples, fieldname, rule, calls, failures, elapsed)
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+
+    def stats(self):
+        rules = {}
+        fields = {}
+
+        with self._lock:
+            for (fieldname, rule), (calls, failures, elapsed) in self._samples.items():
+                record(rules, None, rule, calls, failures, elapsed)
+                record(fields, fieldname, None, calls, failures, elapsed)
+
+        return {
+            'rules': {rule: _summary(*sample) for (_, rule), sample in sorted(rules.items())},
+            'fields': {fieldname: _summary(*sample) for (fieldname, _), sample in sorted(fields.items())},
+        }
+
+    def prometheus(self, prefix='pyvalidator'):
+        stats = self.stats()
+        lines = []
+
+        for group, label in (('rules', 'rule'), ('fields', 'field')):
+            singular = group[:-1]
+            for metric, key, kind, description in (
+                    ('calls_total', 'calls', 'counter', 'Values checked'),
+                    ('failures_total', 'failures', 'counter', 'Values that failed'),
+                    ('seconds_total', 'time', 'counter', 'Time spent checking values')):
+                name = '%s_%s_%s' % (prefix, singular, metric)
+                lines.append('# HELP %s %s, by %s.' % (name, description, label))
+                lines.append('# TYPE %s %s' % (name, kind))
+                for value, summary in stats[group].items():
+                    lines.append('%s{%s="%s"} %r' % (name, label, _escape(value), summary[key]))
+
+        return '\n'.join(lines) + '\n'
+
+
+def _summary(calls, failures, elapsed):
+    return {
+        'calls': calls,
+        'failures': failures,
+        'failure_rate': failures / calls if calls else 0.0,
+        'time': elapsed,
+    }
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,62 @@
+import csv
+import json
+import os
+from itertools import islice
+
+from validator import Validator, Schema
+
+
+FORMAT_NDJSON = 'ndjson'
+FORMAT_CSV = 'csv'
+
+
+def validate_stream(source, rules, messages={}, format=None, chunk_size=1000, bail=False, encoding='utf-8'):
+    schema = rules if isinstance(rules, Schema) else Validator.compile(rules, messages)
+
+    if format is None:
+        name = source if isinstance(source, (str, os.PathLike)) else getattr(source, 'name', '')
+        format = FORMAT_CSV if str(name).lower().endswith('.csv') else FORMAT_NDJSON
+
+    if format not in (FORMAT_NDJSON, FORMAT_CSV):
+        raise ValueError('Unsupported stream format "%s", expected "%s" or "%s"' % (format, FORMAT_NDJSON, FORMAT_CSV))
+
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, encoding=encoding, newline='') as handle:
+            yield from _validate_rows(_read_rows(handle, format), schema, chunk_size, bail)
+    else:
+        yield from _validate_rows(_read_rows(source, format), schema, chunk_size, bail)
+
+
+def _read_rows(handle, format):
+    if format == FORMAT_CSV:
+        reader = csv.DictReader(handle)
+        for record in reader:
+            yield reader.line_num, record
+        return
+
+    for line_no, line in enumerate(handle, 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            raise ValueError('Line %d is not valid JSON: %s' % (line_no, error))
+
+        if not isinstance(record, dict):
+            raise ValueError('Line %d must hold a JSON object, found %s' % (line_no, type(record).__name__))
+
+        yield line_no, record
+
+
+def _validate_rows(rows, schema, chunk_size, bail):
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return
+
+        valid, errors = Validator.validate_many([record for _, record in chunk], schema, bail=bail)
+
+        for index, (line_no, _) in enumerate(chunk):
+            yield line_no, valid[index], errors.get(index, {})
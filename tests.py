@@ -1,6 +1,19 @@
+import asyncio
+import io
+import os
+import sqlite3
+import tempfile
 import unittest
 
-from .validator import Validator
+from .validator import Validator, PARSE_CACHE_SIZE
+from .helpers import read_values, LRUCache
+from .fields import NUMERIC_PATTERN, EmailField, ValidationField
+from .codegen import compile_function
+from .parallel import validate_parallel
+from .profiling import Profiler
+from .stream import validate_stream
+from .unique import MemoryBackend, SQLiteBackend, CachedBackend
+from . import vectorized
 
 
 WHITE_SPACES = "    "
@@ -876,5 +889,1098 @@ class GreaterThanEqualRuleTest(unittest.TestCase):
     #     self.assertFalse(build_validator(data, rules))
 
 
+class SchemaTest(unittest.TestCase):
+    def test_reuse(self):
+        schema = Validator.compile({'field': 'required|numeric|max:255'})
+        self.assertTrue(schema.validate({'field': 12}).valid())
+        self.assertFalse(schema.validate({'field': 300}).valid())
+        self.assertFalse(schema.validate({'field': None}).valid())
+
+    def test_errors(self):
+        schema = Validator.compile({'field': 'required|email'}, {'field.required': 'Missing'})
+        validator = schema.validate({'field': None})
+        self.assertFalse(validator.valid())
+        self.assertEqual(validator.errors(), {'field': ['Missing']})
+
+    def test_validator_accepts_schema(self):
+        schema = Validator.compile({'field1': 'lt:field2'})
+        self.assertTrue(Validator({'field1': 1, 'field2': 2}, schema).valid())
+        self.assertFalse(Validator({'field1': 3, 'field2': 2}, schema).valid())
+
+
+class ValidateManyTest(unittest.TestCase):
+    def test_valid(self):
+        records = [{'field': 1}, {'field': '2'}, {'field': 3.5}]
+        valid, errors = Validator.validate_many(records, {'field': 'required|numeric|max:10'})
+        self.assertEqual(valid, [True, True, True])
+        self.assertEqual(errors, {})
+
+    def test_invalid(self):
+        records = [{'field': 1}, {}, {'field': 30}]
+        valid, errors = Validator.validate_many(records, {'field': 'required|max:10'})
+        self.assertEqual(valid, [True, False, False])
+        self.assertEqual(sorted(errors), [1, 2])
+        self.assertEqual(errors[1], {'field': ['Field field is required']})
+
+    def test_cross_field(self):
+        records = [{'field1': 1, 'field2': 2}, {'field1': 3, 'field2': 2}]
+        valid, errors = Validator.validate_many(iter(records), {'field1': 'lt:field2'})
+        self.assertEqual(valid, [True, False])
+
+    def test_matches_validator(self):
+        rules = {'field1': 'required|in:a,b', 'field2': 'boolean|min:1'}
+        records = [{'field1': 'a', 'field2': 1}, {'field1': 'c', 'field2': '3'}, {'field2': 0}]
+        valid, errors = Validator.validate_many(records, rules)
+        for index, record in enumerate(records):
+            validator = Validator(record, rules)
+            self.assertEqual(valid[index], validator.valid())
+            self.assertEqual(errors.get(index, {}), validator.errors())
+
+
+@unittest.skipIf(vectorized.np is None, 'NumPy is not installed')
+class VectorizedTest(unittest.TestCase):
+    def assertSameAsPython(self, records, rules):
+        self.assertEqual(Validator.validate_many(records, rules),
+                         Validator.validate_many(records, rules, vectorize=False))
+
+    def test_numeric(self):
+        values = [0.0, 1.5, -3.25, 1e-05, 1e16, 1.5e20, float('nan'), float('inf'), 123e-5]
+        self.assertSameAsPython([{'field': value} for value in values], {'field': 'numeric'})
+        self.assertSameAsPython([{'field': value} for value in (0, -5, 10 ** 12)], {'field': 'numeric'})
+
+    def test_min_max(self):
+        records = [{'field': value} for value in (1, 5, 10, 11, -2)]
+        self.assertSameAsPython(records, {'field': 'min:1|max:10'})
+        valid, errors = Validator.validate_many(records, {'field': 'min:1|max:10'})
+        self.assertEqual(valid, [True, True, True, False, False])
+
+    def test_in(self):
+        records = [{'field': value} for value in (3, 7, 45, 8, 0)]
+        self.assertSameAsPython(records, {'field': 'in:9,7,3,45,03,+8'})
+        self.assertSameAsPython(records, {'field': 'not_in:9,7,3,45,0'})
+        records = [{'field': value} for value in (56.5, 3.0, 3.5, 0.0, -0.0, float('nan'))]
+        self.assertSameAsPython(records, {'field': 'in:9,56.5,3,-0.0,nan'})
+        self.assertSameAsPython(records, {'field': 'not_in:3.0,0.0'})
+
+    def test_cross_field(self):
+        records = [{'field1': 1, 'field2': 2}, {'field1': 3, 'field2': 2}, {'field1': 2, 'field2': 2}]
+        for rule in ('lt', 'lte', 'gt', 'gte'):
+            self.assertSameAsPython(records, {'field1': '%s:field2' % rule})
+
+    def test_mixed_column_falls_back(self):
+        records = [{'field': 3}, {'field': 3.0}, {'field': '3'}, {}]
+        self.assertSameAsPython(records, {'field': 'in:3|max:2'})
+
+
+class BailTest(unittest.TestCase):
+    def test_without_bail(self):
+        validator = Validator({'field': 'abc'}, {'field': 'numeric|in:1,2|max:2'})
+        self.assertFalse(validator.valid())
+        self.assertEqual(len(validator.errors()['field']), 3)
+
+    def test_bail(self):
+        validator = Validator({'field': 'abc'}, {'field': 'numeric|in:1,2|max:2'}, bail=True)
+        self.assertFalse(validator.valid())
+        self.assertEqual(validator.errors(), {'field': ['Field field accepts numbers only']})
+
+    def test_bail_rule(self):
+        data = {'field1': 'abc', 'field2': 'abc'}
+        rules = {'field1': 'bail|numeric|max:2', 'field2': 'numeric|max:2'}
+        validator = Validator(data, rules)
+        self.assertFalse(validator.valid())
+        self.assertEqual(len(validator.errors()['field1']), 1)
+        self.assertEqual(len(validator.errors()['field2']), 2)
+
+    def test_bail_many(self):
+        rules = {'field': 'bail|numeric|max:2'}
+        records = [{'field': 'abc'}, {'field': 1}]
+        valid, errors = Validator.validate_many(records, rules)
+        self.assertEqual(valid, [False, True])
+        self.assertEqual(errors, {0: {'field': ['Field field accepts numbers only']}})
+
+    def test_bail_many_skips_failed_rows(self):
+        rules = {'a': 'bail|numeric|lt:b', 'c': 'bail|required|gt:b', 'd': 'bail|max:3|email', 'items.*': 'bail|numeric|max:5'}
+        records = [
+            {'a': 'abc', 'b': 5, 'd': 12345, 'items': ['x', 9]},
+            {'a': 1, 'b': 5, 'c': 6, 'd': 'a@b', 'items': [1]},
+            {'a': 7, 'b': 5, 'c': 2, 'd': [1, 2, 3, 4]},
+        ]
+        for vectorize in (True, False):
+            valid, errors = Validator.validate_many(records, rules, vectorize=vectorize)
+            for index, record in enumerate(records):
+                validator = Validator(record, rules)
+                self.assertEqual(valid[index], validator.valid())
+                self.assertEqual(errors.get(index, {}), validator.errors())
+
+    def test_stop_on_first_error(self):
+        data = {'field1': None, 'field2': 'abc'}
+        validator = Validator(data, {'field1': 'required', 'field2': 'numeric'}, stop_on_first_error=True)
+        self.assertFalse(validator.valid())
+        self.assertEqual(len(validator.errors(compact=True)), 1)
+        self.assertTrue(Validator({'field1': 1}, {'field1': 'required'}, stop_on_first_error=True).valid())
+
+
+class RuleParameterTest(unittest.TestCase):
+    def test_independent_parameters(self):
+        data = {'field1': 8, 'field2': 8}
+        rules = {'field1': 'max:10', 'field2': 'max:5'}
+        validator = Validator(data, rules)
+        self.assertFalse(validator.valid())
+        self.assertEqual(list(validator.errors()), ['field2'])
+
+    def test_independent_values(self):
+        data = {'field1': 'a', 'field2': 'a'}
+        rules = {'field1': 'in:a,b', 'field2': 'in:c,d'}
+        validator = Validator(data, rules)
+        self.assertFalse(validator.valid())
+        self.assertEqual(validator.errors(), {'field2': ['Field field2 accepts only these values: c, d']})
+
+    def test_independent_validators(self):
+        first = Validator({'field': 8}, {'field': 'max:10'})
+        second = Validator({'field': 8}, {'field': 'max:5'})
+        self.assertTrue(first.valid())
+        self.assertFalse(second.valid())
+
+
+class MessageTest(unittest.TestCase):
+    def test_default_message(self):
+        validator = Validator({'field': 'c'}, {'field': 'in:a,b'})
+        self.assertFalse(validator.valid())
+        self.assertEqual(validator.errors(), {'field': ['Field field accepts only these values: a, b']})
+
+    def test_custom_message(self):
+        validator = Validator({'field': 'c', 'other': 11}, {'field': 'in:a,b', 'other': 'max:10'},
+                              {'field.in': 'Bad value', 'other.max': 'Too big'})
+        self.assertFalse(validator.valid())
+        self.assertEqual(validator.errors(), {'field': ['Bad value'], 'other': ['Too big']})
+
+    def test_message_not_built_when_valid(self):
+        validator = Validator({'field': 'a'}, {'field': 'in:a,b'})
+        self.assertTrue(validator.valid())
+        self.assertIsNone(validator.fields['field'][0].message)
+
+
+class EnumValuesTest(unittest.TestCase):
+    def test_typed_matching(self):
+        rules = {'field': 'in:3,4.5,seven'}
+        self.assertTrue(build_validator({'field': 3}, rules))
+        self.assertTrue(build_validator({'field': '3'}, rules))
+        self.assertTrue(build_validator({'field': 4.5}, rules))
+        self.assertTrue(build_validator({'field': 'seven'}, rules))
+        self.assertFalse(build_validator({'field': 3.0}, rules))
+        self.assertFalse(build_validator({'field': True}, rules))
+        self.assertFalse(build_validator({'field': 4}, rules))
+
+    def test_iterable(self):
+        codes = ['code%d' % index for index in range(5000)]
+        rules = {'field': ['required', ('in', codes)]}
+        self.assertTrue(build_validator({'field': 'code4999'}, rules))
+        self.assertFalse(build_validator({'field': 'code5000'}, rules))
+        rules = {'field': [('not_in', range(10))]}
+        self.assertTrue(build_validator({'field': 10}, rules))
+        self.assertFalse(build_validator({'field': 9}, rules))
+        self.assertFalse(build_validator({'field': '9'}, rules))
+
+    def test_file(self):
+        source = io.StringIO('EGP\nUSD\n\n EUR \n')
+        rules = {'field': [('in', read_values(source))]}
+        self.assertTrue(build_validator({'field': 'EUR'}, rules))
+        self.assertFalse(build_validator({'field': 'GBP'}, rules))
+
+    def test_list_rules(self):
+        rules = {'field': ['required', 'numeric', 'max:10']}
+        self.assertTrue(build_validator({'field': 5}, rules))
+        self.assertFalse(build_validator({'field': 50}, rules))
+
+
+class FastPathTest(unittest.TestCase):
+    def test_numeric_matches_pattern(self):
+        values = [1, -1, 10 ** 20, 0.5, -2.75, 1e-4, 9.99e-5, 1e15, 1e16, 123e5, 1e100, float('inf'), float('nan')]
+        for value in values:
+            expected = bool(NUMERIC_PATTERN.match(str(value)))
+            self.assertEqual(build_validator({'field': value}, {'field': 'numeric'}), expected, value)
+
+    def test_numeric_rejects_bool(self):
+        self.assertFalse(build_validator({'field': True}, {'field': 'numeric'}))
+
+    def test_email_without_at(self):
+        self.assertFalse(build_validator({'field': 'mail.mail.com'}, {'field': 'email'}))
+
+
+class StreamTest(unittest.TestCase):
+    rules = {'name': 'required', 'age': 'numeric|max:120'}
+
+    def test_ndjson(self):
+        source = io.StringIO('{"name": "a", "age": 30}\n\n{"name": "", "age": 300}\n')
+        results = list(validate_stream(source, self.rules))
+        self.assertEqual([(line_no, valid) for line_no, valid, _ in results], [(1, True), (3, False)])
+        self.assertEqual(sorted(results[1][2]), ['age', 'name'])
+
+    def test_csv(self):
+        source = io.StringIO('name,age\na,30\nb,abc\n,5\n')
+        results = list(validate_stream(source, self.rules, format='csv', chunk_size=2))
+        self.assertEqual([(line_no, valid) for line_no, valid, _ in results], [(2, True), (3, False), (4, False)])
+
+    def test_path(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'records.csv')
+            with open(path, 'w') as handle:
+                handle.write('name,age\na,30\n')
+            self.assertEqual(list(validate_stream(path, self.rules)), [(2, True, {})])
+
+    def test_lazy(self):
+        def lines():
+            yield '{"name": "a"}\n'
+            raise AssertionError('read past the first chunk')
+
+        results = validate_stream(lines(), self.rules, chunk_size=1)
+        self.assertEqual(next(results), (1, True, {}))
+
+    def test_invalid_json(self):
+        with self.assertRaises(ValueError):
+            list(validate_stream(io.StringIO('{"name": \n'), self.rules))
+
+
+class ParallelTest(unittest.TestCase):
+    rules = {'field1': 'required|numeric|max:100', 'field2': 'in:a,b|lt:field3'}
+
+    def records(self, count):
+        return [{'field1': index if index % 7 else 'x', 'field2': 'abc'[index % 3], 'field3': 'abcd'}
+                for index in range(count)]
+
+    def test_matches_validate_many(self):
+        records = self.records(250)
+        expected = Validator.validate_many(records, self.rules)
+        self.assertEqual(validate_parallel(iter(records), self.rules, workers=2, chunk_size=30), expected)
+
+    def test_single_worker(self):
+        records = self.records(50)
+        expected = Validator.validate_many(records, self.rules)
+        self.assertEqual(validate_parallel(records, self.rules, workers=1, chunk_size=7), expected)
+
+
+class CodegenTest(unittest.TestCase):
+    rules = {
+        'field1': 'required|email',
+        'field2': 'numeric|min:1|max:10.5',
+        'field3': 'in:a,b,3,4.5|not_in:b',
+        'field4': 'boolean',
+        'field5': 'lt:field6|gte:field7',
+    }
+    samples = [
+        {'field1': 'mail@mail.com', 'field2': 5, 'field3': 'a', 'field4': 1, 'field5': 1, 'field6': 2, 'field7': 1},
+        {'field1': '', 'field2': '11', 'field3': 'b', 'field4': 'yes', 'field5': 'abc', 'field6': 'ab', 'field7': 'a'},
+        {'field1': 'mail', 'field2': 'x', 'field3': 3, 'field4': None, 'field5': [1], 'field6': (1, 2), 'field7': []},
+        {'field2': 1e-05, 'field3': 4.5, 'field5': 3.5, 'field6': 3, 'field7': 4},
+    ]
+
+    def assertSameAsValidator(self, rules, **options):
+        validate = compile_function(rules, **options)
+        for data in self.samples:
+            validator = Validator(data, rules, **options)
+            self.assertEqual(validate(data), (validator.valid(), validator.errors()))
+
+    def test_matches_validator(self):
+        self.assertSameAsValidator(self.rules)
+
+    def test_bail(self):
+        self.assertSameAsValidator(self.rules, bail=True)
+        self.assertSameAsValidator({'field2': 'bail|numeric|min:1|max:10.5', 'field3': 'in:a|not_in:b'})
+
+    def test_stop_on_first_error(self):
+        self.assertSameAsValidator(self.rules, stop_on_first_error=True)
+
+    def test_messages(self):
+        validate = compile_function({'field': 'required'}, {'field.required': 'Missing'})
+        self.assertEqual(validate({}), (False, {'field': ['Missing']}))
+        self.assertIn('def validate(data):', validate.source)
+
+    def test_mismatched_types(self):
+        validate = compile_function({'field1': 'lt:field2'})
+        with self.assertRaises(ValueError):
+            validate({'field1': 1, 'field2': 'abc'})
+
+
+class ParseCacheTest(unittest.TestCase):
+    def tearDown(self):
+        Validator.set_parse_cache_size(PARSE_CACHE_SIZE)
+
+    def test_hits(self):
+        rules = {'field1': 'required|numeric|max:255 ', 'field2': 'required|numeric|max:255'}
+        Validator({}, rules)
+        before = Validator.parse_cache_info()
+        Validator({}, rules)
+        after = Validator.parse_cache_info()
+        self.assertEqual(after['hits'] - before['hits'], 2)
+        self.assertEqual(after['misses'], before['misses'])
+
+    def test_size(self):
+        Validator.set_parse_cache_size(2)
+        for index in range(5):
+            Validator({}, {'field': 'max:%d' % index})
+        info = Validator.parse_cache_info()
+        self.assertEqual(info['size'], 2)
+        self.assertEqual(info['maxsize'], 2)
+
+    def test_disabled(self):
+        Validator.set_parse_cache_size(0)
+        self.assertEqual(Validator.parse_cache_info()['size'], 0)
+        self.assertFalse(build_validator({'field': 5}, {'field': 'max:2'}))
+        self.assertEqual(Validator.parse_cache_info()['size'], 0)
+
+
+class LRUCacheTest(unittest.TestCase):
+    def test_eviction(self):
+        cache = LRUCache(2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        self.assertEqual(cache.get('a'), 1)
+        cache.put('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 3)
+        info = cache.info()
+        self.assertEqual((info['hits'], info['misses'], info['evictions']), (2, 1, 1))
+
+
+def even(value, data):
+    return value % 2 == 0
+
+
+def not_reserved(value, data):
+    return True if value != data['reserved'] else 'Field is reserved'
+
+
+async def available(value, data):
+    await asyncio.sleep(0)
+    return value not in ('taken', 'used')
+
+
+class CallbackRuleTest(unittest.TestCase):
+    def test_callback(self):
+        rules = {'field': ['required', even, not_reserved]}
+        self.assertTrue(build_validator({'field': 2, 'reserved': 4}, rules))
+        validator = Validator({'field': 4, 'reserved': 4}, rules, {'field.callback': 'Odd'})
+        self.assertFalse(validator.valid())
+        self.assertEqual(validator.errors(), {'field': ['Field is reserved']})
+        validator = Validator({'field': 3, 'reserved': 3}, rules)
+        self.assertFalse(validator.valid())
+        self.assertEqual(validator.errors(), {'field': ['Field field is invalid', 'Field is reserved']})
+
+    def test_callback_many(self):
+        records = [{'field': 2, 'reserved': 4}, {'field': 4, 'reserved': 4}]
+        valid, errors = Validator.validate_many(records, {'field': [even, not_reserved]})
+        self.assertEqual(valid, [True, False])
+
+    def test_callback_codegen(self):
+        rules = {'field': ['required', even, not_reserved]}
+        validate = compile_function(rules)
+        for data in ({'field': 2, 'reserved': 4}, {'field': 3, 'reserved': 3}):
+            validator = Validator(data, rules)
+            self.assertEqual(validate(data), (validator.valid(), validator.errors()))
+
+    def test_callback_string_is_unknown(self):
+        self.assertTrue(build_validator({'field': 1}, {'field': 'required|callback'}))
+        self.assertTrue(build_validator({'field': 1}, {'field': ['required', ('callback', 'even')]}))
+
+
+class AsyncTest(unittest.TestCase):
+    rules = {'name': ['required', available], 'other': ['required', available], 'age': 'numeric'}
+
+    def test_avalid(self):
+        validator = Validator({'name': 'free', 'other': 'x', 'age': 3}, self.rules)
+        self.assertTrue(asyncio.run(validator.avalid()))
+        validator = Validator({'name': 'taken', 'other': 'used', 'age': 'x'}, self.rules)
+        self.assertFalse(asyncio.run(validator.avalid()))
+        self.assertEqual(list(validator.errors()), ['name', 'other', 'age'])
+
+    def test_sync_valid_rejects_async_rule(self):
+        with self.assertRaises(TypeError):
+            Validator({'name': 'free'}, self.rules).valid()
+
+    def test_sync_rules(self):
+        validator = Validator({'age': 'x'}, {'age': 'numeric'})
+        self.assertFalse(asyncio.run(validator.avalid()))
+
+    def test_bail_and_stop(self):
+        validator = Validator({'name': None, 'other': 'used'}, self.rules, bail=True)
+        self.assertFalse(asyncio.run(validator.avalid()))
+        self.assertEqual(validator.errors(), {'name': ['Field name is required'],
+                                              'other': ['Field other is invalid']})
+        validator = Validator({'name': 'taken', 'other': 'used'}, self.rules, stop_on_first_error=True)
+        self.assertFalse(asyncio.run(validator.avalid()))
+        self.assertEqual(len(validator.errors(compact=True)), 1)
+
+    def test_avalidate_many(self):
+        records = [{'name': 'free', 'other': 'x'}, {'name': 'taken', 'other': 'x'}]
+        valid, errors = asyncio.run(Validator.avalidate_many(records, self.rules))
+        self.assertEqual(valid, [True, False])
+        self.assertEqual(errors, {1: {'name': ['Field name is invalid']}})
+
+
+class UniqueRuleTest(unittest.TestCase):
+    def setUp(self):
+        self.connection = sqlite3.connect(':memory:')
+        self.connection.execute('CREATE TABLE users (email TEXT, name TEXT)')
+        self.connection.executemany('INSERT INTO users VALUES (?, ?)', [('a@mail.com', 'a'), ('b@mail.com', 'b')])
+        Validator.set_unique_backend(SQLiteBackend(self.connection))
+
+    def tearDown(self):
+        Validator.set_unique_backend(None)
+        self.connection.close()
+
+    def test_valid(self):
+        self.assertTrue(build_validator({'email': 'c@mail.com'}, {'email': 'unique:users'}))
+        self.assertTrue(build_validator({'email': None}, {'email': 'unique:users'}))
+        self.assertTrue(build_validator({'login': 'c'}, {'login': 'unique:users,name'}))
+
+    def test_invalid(self):
+        self.assertFalse(build_validator({'email': 'a@mail.com'}, {'email': 'unique:users'}))
+        self.assertFalse(build_validator({'login': 'b'}, {'login': 'unique:users,name'}))
+
+    def test_batch(self):
+        lookups = []
+        backend = SQLiteBackend(self.connection)
+        self.connection.set_trace_callback(lookups.append)
+        Validator.set_unique_backend(backend)
+
+        records = [{'email': 'c@mail.com'}, {'email': 'a@mail.com'}, {'email': 'c@mail.com'}, {'email': ''}]
+        valid, errors = Validator.validate_many(records, {'email': 'unique:users'})
+        self.assertEqual(valid, [True, False, False, True])
+        self.assertEqual(errors[2], {'email': ['Field email has already been taken']})
+        self.assertEqual(len(lookups), 1)
+
+    def test_memory_backend(self):
+        Validator.set_unique_backend(MemoryBackend({'users': {'email': ['a@mail.com']}}))
+        self.assertFalse(build_validator({'email': 'a@mail.com'}, {'email': 'unique:users'}))
+        self.assertTrue(build_validator({'email': 'b@mail.com'}, {'email': 'unique:users'}))
+
+    def test_cached_backend(self):
+        memory = MemoryBackend({'users': {'email': ['a@mail.com']}})
+        Validator.set_unique_backend(CachedBackend(memory, ttl=60))
+        self.assertFalse(build_validator({'email': 'a@mail.com'}, {'email': 'unique:users'}))
+        memory.tables['users']['email'].clear()
+        self.assertFalse(build_validator({'email': 'a@mail.com'}, {'email': 'unique:users'}))
+        self.assertTrue(build_validator({'email': 'b@mail.com'}, {'email': 'unique:users'}))
+
+    def test_invalid_table(self):
+        with self.assertRaises(ValueError):
+            build_validator({'email': 'a'}, {'email': 'unique:users;drop'})
+
+    def test_codegen(self):
+        validate = compile_function({'email': 'unique:users'})
+        self.assertEqual(validate({'email': 'a@mail.com'}), (False, {'email': ['Field email has already been taken']}))
+
+    def test_unhashable(self):
+        rules = {'email': 'unique:users'}
+        errors = {'email': ['Field email has already been taken']}
+        validator = Validator({'email': ['c@mail.com']}, rules)
+        self.assertFalse(validator.valid())
+        self.assertEqual(validator.errors(), errors)
+        records = [{'email': ['c@mail.com']}, {'email': 'c@mail.com'}, {'email': {'a': 1}}]
+        self.assertEqual(Validator.validate_many(records, rules), ([False, True, False], {0: errors, 2: errors}))
+        self.assertEqual(compile_function(rules)({'email': ['c@mail.com']}), (False, errors))
+
+    def test_nested_and_wildcard(self):
+        rules = {'user.email': 'unique:users', 'items.*.email': 'unique:users'}
+        data = {'user': {'email': 'a@mail.com'}, 'items': [{'email': 'c@mail.com'}, {'email': 'b@mail.com'}]}
+        errors = {
+            'user.email': ['Field user.email has already been taken'],
+            'items.1.email': ['Field items.1.email has already been taken'],
+        }
+        validator = Validator(data, rules)
+        self.assertFalse(validator.valid())
+        self.assertEqual(validator.errors(), errors)
+        self.assertEqual(Validator.validate_many([data], rules), ([False], {0: errors}))
+        self.assertEqual(compile_function(rules)(data), (False, errors))
+
+
+class NestedFieldTest(unittest.TestCase):
+    data = {
+        'user': {'name': 'someone', 'address': {'zip': '12345'}},
+        'items': [{'price': 10, 'qty': 1}, {'price': 'free', 'qty': 2}, {'qty': 3}],
+        'range': {'start': 1, 'end': 5},
+    }
+
+    def test_dotted(self):
+        self.assertTrue(build_validator(self.data, {'user.address.zip': 'required|numeric'}))
+        self.assertFalse(build_validator(self.data, {'user.address.city': 'required'}))
+        self.assertFalse(build_validator(self.data, {'user.name.first': 'required'}))
+
+    def test_wildcard(self):
+        validator = Validator(self.data, {'items.*.price': 'required|numeric'}, {'items.*.price.numeric': 'Bad price'})
+        self.assertFalse(validator.valid())
+        self.assertEqual(validator.errors(), {'items.1.price': ['Bad price'],
+                                              'items.2.price': ['Field items.2.price is required']})
+
+    def test_index(self):
+        self.assertTrue(build_validator(self.data, {'items.0.price': 'required|max:10'}))
+        self.assertFalse(build_validator(self.data, {'items.5.price': 'required'}))
+
+    def test_cross_field(self):
+        self.assertTrue(build_validator(self.data, {'range.start': 'lt:range.end'}))
+        self.assertFalse(build_validator(self.data, {'range.end': 'lt:range.start'}))
+        with self.assertRaises(KeyError):
+            build_validator(self.data, {'range.end': 'lt:range.middle'})
+
+    def test_many(self):
+        rules = {'items.*.price': 'bail|required|numeric|max:10', 'user.address.zip': 'required'}
+        records = [self.data, {'items': [{'price': 5}, {'price': 50}]}]
+        valid, errors = Validator.validate_many(records, rules)
+        self.assertEqual(valid, [False, False])
+        for index, record in enumerate(records):
+            validator = Validator(record, rules)
+            validator.valid()
+            self.assertEqual(errors[index], validator.errors())
+
+    def test_codegen(self):
+        rules = {'items.*.price': 'required|numeric', 'user.address.zip': 'required', 'range.start': 'lt:range.end'}
+        validate = compile_function(rules)
+        validator = Validator(self.data, rules)
+        self.assertEqual(validate(self.data), (validator.valid(), validator.errors()))
+
+
+class WildcardListTest(unittest.TestCase):
+    def assertSameAsGenerated(self, data, rules, **kwargs):
+        validator = Validator(data, rules, **kwargs)
+        validate = compile_function(rules, stop_on_first_error=kwargs.get('stop_on_first_error', False))
+        self.assertEqual((validator.valid(), validator.errors()), validate(data))
+
+    def test_items(self):
+        validator = Validator({'items': [3, 'x', 12, None]}, {'items.*': 'required|numeric|max:10'})
+        self.assertFalse(validator.valid())
+        self.assertEqual(validator.errors(), {
+            'items.1': ['Field items.1 accepts numbers only'],
+            'items.2': ['Field items.2 has a maximum of: 10'],
+            'items.3': ['Field items.3 is required'],
+        })
+
+    def test_single_field(self):
+        validator = Validator({'items': list(range(1000))}, {'items.*': 'numeric|max:2000'})
+        self.assertEqual(list(validator.fields), ['items.*'])
+        self.assertEqual(len(validator.fields['items.*']), 2)
+        self.assertTrue(validator.valid())
+
+    def test_matches_per_item(self):
+        values = [1, 5, 50, 2.5, 'x', '', None, '7', 1e20, -3] * 20
+        numbers = [value for value in values if isinstance(value, (int, float))]
+        data = {'items': values, 'lines': [{'qty': value} for value in numbers], 'limit': 10}
+        for rules in ({'items.*': 'required|numeric|max:10'}, {'items.*': 'bail|required|numeric|max:10'},
+                      {'items.*': 'in:1,5,7|not_in:5'}, {'lines.*.qty': 'min:0|lt:limit'}):
+            self.assertSameAsGenerated(data, rules)
+            self.assertSameAsGenerated(data, rules, stop_on_first_error=True)
+
+    def test_stop_on_first_error_mixed_types(self):
+        rules = {'items.*': 'lte:o|gt:o'}
+        data = {'o': 5, 'items': [1, []]}
+        self.assertSameAsGenerated(data, rules, stop_on_first_error=True)
+        self.assertSameAsGenerated({'o': 5, 'items': ['x', 2, 9]}, {'items.*': 'numeric|lt:o'}, stop_on_first_error=True)
+        validator = Validator(data, rules, stop_on_first_error=True)
+        self.assertFalse(validator.valid())
+        self.assertEqual(list(validator.errors()), ['items.0'])
+
+    def test_bail_narrows_items(self):
+        data = {'items': [1, 5, 50, 3, 20, 0] * 10}
+        self.assertSameAsGenerated(data, {'items.*': 'bail|min:2|max:10|not_in:5'})
+        self.assertSameAsGenerated(data, {'items.*': 'min:2|max:10|not_in:5'}, stop_on_first_error=True)
+
+    def test_messages(self):
+        validator = Validator({'items': ['a', 2]}, {'items.*': 'numeric|in:1'}, {'items.*.numeric': 'Bad item'})
+        self.assertFalse(validator.valid())
+        self.assertEqual(validator.errors(), {'items.0': ['Bad item', 'Field items.0 accepts only these values: 1'],
+                                              'items.1': ['Field items.1 accepts only these values: 1']})
+
+    def test_async(self):
+        validator = Validator({'items': [1, 'x'], 'codes': [2, 3]}, {'items.*': 'numeric', 'codes.*': [available]})
+        self.assertFalse(asyncio.run(validator.avalid()))
+        self.assertIn('items.1', validator.errors())
+
+
+class FieldSlotsTest(unittest.TestCase):
+    rules = {
+        'a': 'required|email|numeric|in:1|max:5|min:0|not_in:3|boolean|lt:b|lte:b|gt:b|gte:b|unique:users',
+        'b': [even],
+    }
+
+    def test_no_instance_dict(self):
+        validator = Validator({'a': 1, 'b': 2}, self.rules)
+        for fieldlist in validator.fields.values():
+            for field in fieldlist:
+                self.assertFalse(hasattr(field, '__dict__'))
+
+    def test_rule_names(self):
+        validator = Validator({'a': 1, 'b': 2}, self.rules)
+        self.assertEqual([field.rule for field in validator.fields['a']], [
+            'required', 'email', 'numeric', 'in', 'max', 'min', 'not_in', 'boolean', 'lt', 'lte', 'gt', 'gte', 'unique'])
+        self.assertEqual([field.rule for field in validator.fields['b']], ['callback'])
+
+
+class RuleCheckTest(unittest.TestCase):
+    rules = {'a': 'required|max:5', 'b': 'lt:a', 'items.*': 'numeric'}
+
+    def test_shared_fields(self):
+        schema = Validator.compile(self.rules)
+        first = schema.validate({'a': 3, 'b': 1, 'items': [1, 2]})
+        second = schema.validate({'a': 9, 'b': 10, 'items': ['x']})
+        self.assertIs(first.fields, second.fields)
+        self.assertTrue(first.valid())
+        self.assertFalse(second.valid())
+        self.assertEqual(second.errors(), {'a': ['Field a has a maximum of: 5'],
+                                           'b': ['Field b must be less than the field a in size'],
+                                           'items.0': ['Field items.0 accepts numbers only']})
+
+    def test_check(self):
+        schema = Validator.compile(self.rules)
+        required, maximum = schema.rule_fields['a']
+        lessthan, = schema.rule_fields['b']
+        self.assertTrue(required.check('value', {}))
+        self.assertEqual(required.check('', {}), 'Field a is required')
+        self.assertTrue(maximum.check(5, None))
+        self.assertTrue(lessthan.check(1, {'a': 3}))
+        self.assertEqual(lessthan.check(4, {'a': 3}), 'Field b must be less than the field a in size')
+        self.assertEqual(lessthan.check_column([1, 4], [{'a': 3}, {'a': 3}]),
+                         [True, 'Field b must be less than the field a in size'])
+        self.assertFalse(hasattr(required, 'value'))
+
+
+class CrossFieldColumnTest(unittest.TestCase):
+    records = [
+        {'start': 1, 'end': 2.5}, {'start': 3, 'end': 2}, {'start': 'ab', 'end': 'abc'}, {'start': 'abcd', 'end': 'a'},
+        {'start': [1, 2], 'end': (1,)}, {'start': None, 'end': None}, {'start': True, 'end': 2},
+    ]
+
+    def assertSameAsSingle(self, records, rules):
+        valid, errors = Validator.validate_many(records, rules, vectorize=False)
+        for index, record in enumerate(records):
+            validator = Validator(record, rules)
+            self.assertEqual(valid[index], validator.valid())
+            self.assertEqual(errors.get(index, {}), validator.errors())
+
+    def test_uniform_columns(self):
+        for rule in ('lt', 'lte', 'gt', 'gte'):
+            self.assertSameAsSingle(self.records[:2], {'start': '%s:end' % rule})
+            self.assertSameAsSingle(self.records[2:4], {'start': '%s:end' % rule})
+            self.assertSameAsSingle(self.records[4:5], {'start': '%s:end' % rule})
+
+    def test_mixed_columns(self):
+        for rule in ('lt', 'lte', 'gt', 'gte'):
+            self.assertSameAsSingle(self.records, {'start': '%s:end' % rule})
+
+    def test_type_mismatch(self):
+        records = [{'start': 1, 'end': 2}, {'start': 'a', 'end': 2}]
+        with self.assertRaises(ValueError) as context:
+            Validator.validate_many(records, {'start': 'lt:end'}, vectorize=False)
+        self.assertIn('Field start holds str and field end holds int in row 1', str(context.exception))
+
+    def test_missing_other_field(self):
+        with self.assertRaises(KeyError):
+            Validator.validate_many([{'start': 1, 'end': 2}, {'start': 1}], {'start': 'lt:end'})
+
+
+class EvenField(ValidationField):
+    __slots__ = ()
+
+    rule = 'even'
+
+    class Meta:
+        message = 'Field {#fieldname#} must be even'
+
+    def check(self, value, data):
+        if value is None or value % 2 == 0:
+            return True
+        return self._invoke_error()
+
+
+class DivisibleField(ValidationField):
+    __slots__ = ('_divisor',)
+
+    rule = 'divisible'
+
+    class Meta:
+        message = 'Field {#fieldname#} is not divisible'
+
+    def __init__(self, fieldname, message=None):
+        self._divisor = 1
+        super(DivisibleField, self).__init__(fieldname, message)
+
+    def check(self, value, data):
+        return True if value % self._divisor == 0 else self._invoke_error()
+
+
+def divisible(fieldname, rulevalue, message):
+    field = DivisibleField(fieldname, message)
+    field._divisor = int(rulevalue)
+    return field
+
+
+class CorpEmailField(EmailField):
+    __slots__ = ()
+
+    def check(self, value, data):
+        check = super(CorpEmailField, self).check(value, data)
+        if check is True and value and not value.endswith('@corp.com'):
+            return self._invoke_error()
+        return check
+
+
+class RegisterRuleTest(unittest.TestCase):
+    def setUp(self):
+        Validator.register_rule('even')(EvenField)
+        Validator.register_rule('divisible')(divisible)
+        self.addCleanup(Validator._rule_factories.pop, 'even')
+        self.addCleanup(Validator._rule_factories.pop, 'divisible')
+
+    def test_field_class(self):
+        self.assertTrue(build_validator({'a': 4}, {'a': 'required|even'}))
+        validator = Validator({'a': 3}, {'a': 'required|even'}, {'a.even': 'Odd'})
+        self.assertFalse(validator.valid())
+        self.assertEqual(validator.errors(), {'a': ['Odd']})
+
+    def test_factory(self):
+        self.assertTrue(build_validator({'a': 9}, {'a': 'divisible:3'}))
+        validator = Validator({'a': 10}, {'a': 'divisible:3|even'})
+        self.assertFalse(validator.valid())
+        self.assertEqual(validator.errors(), {'a': ['Field a is not divisible']})
+
+    def test_many_and_codegen(self):
+        rules = {'a': 'even|divisible:3', 'items.*': 'even'}
+        records = [{'a': 6, 'items': [2]}, {'a': 4, 'items': [1, 2, 3]}, {'a': 9}]
+        valid, errors = Validator.validate_many(records, rules)
+        validate = compile_function(rules)
+        for index, record in enumerate(records):
+            self.assertEqual(validate(record), (valid[index], errors.get(index, {})))
+
+    def test_unknown_rule(self):
+        self.assertTrue(build_validator({'a': 3}, {'a': 'odd|max:5'}))
+
+    def test_replaced_builtin_codegen(self):
+        self.addCleanup(Validator._rule_factories.__setitem__, 'email', Validator._rule_factories['email'])
+        Validator.register_rule('email')(CorpEmailField)
+
+        rules = {'a': 'required|email'}
+        validator = Validator({'a': 'x@gmail.com'}, rules)
+        self.assertFalse(validator.valid())
+        self.assertEqual(compile_function(rules)({'a': 'x@gmail.com'}), (False, validator.errors()))
+        self.assertEqual(compile_function(rules)({'a': 'x@corp.com'}), (True, {}))
+
+    def test_builtin_subclass(self):
+        Validator.register_rule('corp_email')(CorpEmailField)
+        self.addCleanup(Validator._rule_factories.pop, 'corp_email')
+        self.assertEqual(CorpEmailField.rule, 'email')
+
+        validator = Validator({'a': 'x@gmail.com', 'b': 'x@gmail.com'}, {'a': 'email', 'b': 'corp_email'}, profile=True)
+        self.assertFalse(validator.valid())
+        self.assertEqual(list(validator.errors()), ['b'])
+        self.assertEqual(sorted(validator.stats()['rules']), ['corp_email', 'email'])
+
+    def test_registered_class_is_not_modified(self):
+        Validator.register_rule('mail')(EmailField)
+        self.addCleanup(Validator._rule_factories.pop, 'mail')
+        self.assertEqual(EmailField.rule, 'email')
+
+        schema = Validator.compile({'a': 'email', 'b': 'mail'})
+        self.assertEqual([fieldlist[0].rule for fieldlist in schema.rule_fields.values()], ['email', 'mail'])
+        self.assertEqual(schema.volatile, frozenset(['b']))
+
+
+class ProfilerTest(unittest.TestCase):
+    rules = {'age': 'required|numeric|max:120', 'email': 'bail|required|email', 'items.*': 'numeric'}
+    data = {'age': 150, 'email': '', 'items': [1, 'x', 3]}
+
+    def test_validator_stats(self):
+        validator = Validator(self.data, self.rules, profile=True)
+        self.assertFalse(validator.valid())
+        stats = validator.stats()
+
+        self.assertEqual(stats['rules']['required']['calls'], 2)
+        self.assertEqual(stats['rules']['required']['failures'], 1)
+        self.assertEqual(stats['rules']['required']['failure_rate'], 0.5)
+        self.assertEqual(stats['rules']['numeric'], dict(stats['rules']['numeric'], calls=4, failures=1))
+        self.assertNotIn('email', stats['rules'])
+        self.assertEqual(stats['fields']['age']['calls'], 3)
+        self.assertEqual(stats['fields']['age']['failures'], 1)
+        self.assertEqual(stats['fields']['items.*']['calls'], 3)
+        self.assertGreaterEqual(stats['fields']['age']['time'], 0)
+
+    def test_disabled(self):
+        validator = Validator(self.data, self.rules)
+        self.assertFalse(validator.valid())
+        self.assertEqual(validator.stats(), {'rules': {}, 'fields': {}})
+
+    def test_global_collector(self):
+        profiler = Profiler()
+        Validator.set_profiler(profiler)
+        self.addCleanup(Validator.set_profiler, None)
+
+        schema = Validator.compile(self.rules)
+        for _ in range(3):
+            schema.validate(self.data).valid()
+
+        stats = profiler.stats()
+        self.assertEqual(stats['rules']['max'], dict(stats['rules']['max'], calls=3, failures=3, failure_rate=1.0))
+        profiler.reset()
+        self.assertEqual(profiler.stats(), {'rules': {}, 'fields': {}})
+
+    def test_prometheus(self):
+        validator = Validator({'a"b': ''}, {'a"b': 'required'}, profile=True)
+        validator.valid()
+        text = validator.profiler.prometheus()
+        self.assertIn('# TYPE pyvalidator_rule_calls_total counter', text)
+        self.assertIn('pyvalidator_rule_calls_total{rule="required"} 1', text)
+        self.assertIn('pyvalidator_field_failures_total{field="a\\"b"} 1', text)
+
+
+class CoerceTest(unittest.TestCase):
+    def test_cleaned(self):
+        data = {'age': '42', 'price': '-12.5', 'big': '1e5', 'flag': '0', 'on': 1, 'name': 'someone', 'empty': ''}
+        rules = {'age': 'required|numeric|max:120', 'price': 'numeric', 'big': 'numeric', 'flag': 'boolean',
+                 'on': 'boolean', 'name': 'required', 'empty': 'numeric|boolean'}
+        validator = Validator(data, rules, coerce=True)
+        self.assertTrue(validator.valid())
+        cleaned = validator.cleaned()
+        self.assertEqual(cleaned, {'age': 42, 'price': -12.5, 'big': 100000.0, 'flag': False, 'on': True,
+                                   'name': 'someone', 'empty': ''})
+        self.assertIs(type(cleaned['age']), int)
+        self.assertIs(type(cleaned['on']), bool)
+        self.assertEqual(data['age'], '42')
+
+    def test_same_errors(self):
+        data = {'age': '150', 'count': 'abc', 'flag': 'yes', 'items': ['1', 'x', '2.5']}
+        rules = {'age': 'numeric|max:120', 'count': 'bail|numeric|min:1', 'flag': 'boolean', 'items.*': 'numeric'}
+        plain = Validator(data, rules)
+        coerced = Validator(data, rules, coerce=True)
+        self.assertEqual(plain.valid(), coerced.valid())
+        self.assertEqual(plain.errors(), coerced.errors())
+        self.assertEqual(coerced.cleaned(), dict(data, age=150, items=[1, 'x', 2.5]))
+
+    def test_nested(self):
+        data = {'order': {'lines': [{'qty': '2', 'gift': '1'}, {'qty': '3'}]}, 'other': {'a': 1}}
+        rules = {'order.lines.*.qty': 'numeric', 'order.lines.*.gift': 'boolean'}
+        validator = Validator(data, rules, coerce=True)
+        self.assertTrue(validator.valid())
+        self.assertEqual(validator.cleaned(), {'order': {'lines': [{'qty': 2, 'gift': True}, {'qty': 3}]},
+                                               'other': {'a': 1}})
+        self.assertEqual(data['order']['lines'][0], {'qty': '2', 'gift': '1'})
+        self.assertIs(validator.cleaned()['other'], data['other'])
+
+    def test_profiled(self):
+        validator = Validator({'age': '42'}, {'age': 'numeric'}, profile=True, coerce=True)
+        self.assertTrue(validator.valid())
+        self.assertEqual(validator.cleaned(), {'age': 42})
+
+
+class SameField(ValidationField):
+    __slots__ = ('_other',)
+
+    class Meta:
+        message = 'Field {#fieldname#} does not match'
+
+    def __init__(self, fieldname, message=None):
+        self._other = None
+        super(SameField, self).__init__(fieldname, message)
+
+    def set_rule_value(self, rulevalue):
+        self._other = rulevalue
+
+    def check(self, value, data):
+        return True if value == data.get(self._other) else self._invoke_error()
+
+
+class UpdateTest(unittest.TestCase):
+    rules = {
+        'name': 'required|max:10',
+        'start': 'required|numeric|lt:end',
+        'end': 'required|numeric',
+        'email': 'required|email',
+        'items.*.qty': 'numeric|min:1',
+    }
+    data = {'name': 'someone', 'start': 1, 'end': 5, 'email': 'mail@mail.com', 'items': [{'qty': 1}]}
+
+    def assertSameAsNew(self, validator):
+        fresh = Validator(validator.data, self.rules)
+        self.assertEqual(fresh.valid(), not validator.errors())
+        self.assertEqual(fresh.errors(), validator.errors())
+
+    def test_update(self):
+        validator = Validator(self.data, self.rules)
+        self.assertTrue(validator.valid())
+
+        self.assertFalse(validator.update({'end': 0}))
+        self.assertEqual(validator.errors(), {'start': ['Field start must be less than the field end in size']})
+        self.assertSameAsNew(validator)
+
+        self.assertFalse(validator.update({'email': 'nope', 'items': [{'qty': 0}, {'qty': 'x'}]}))
+        self.assertSameAsNew(validator)
+
+        self.assertFalse(validator.update({'end': 10, 'email': ''}))
+        self.assertSameAsNew(validator)
+
+        self.assertTrue(validator.update({'email': 'mail@mail.com', 'items': []}))
+        self.assertEqual(validator.errors(), {})
+        self.assertEqual(self.data['end'], 5)
+
+    def test_reruns_affected_fields_only(self):
+        validator = Validator(self.data, self.rules, profile=True)
+        self.assertTrue(validator.update({}))
+        validator.update({'end': 3})
+
+        fields = validator.stats()['fields']
+        self.assertEqual(fields['start']['calls'], 6)
+        self.assertEqual(fields['end']['calls'], 4)
+        self.assertEqual(fields['name']['calls'], 2)
+        self.assertEqual(fields['email']['calls'], 2)
+
+    def test_callbacks_always_rerun(self):
+        def matches(value, data):
+            return value == data['password']
+
+        validator = Validator({'password': 'a', 'confirm': 'a'}, {'confirm': [matches]})
+        self.assertTrue(validator.valid())
+        self.assertFalse(validator.update({'password': 'b'}))
+
+    def test_registered_rules_always_rerun(self):
+        Validator.register_rule('same')(SameField)
+        self.addCleanup(Validator._rule_factories.pop, 'same')
+
+        validator = Validator({'pw': 'a', 'confirm': 'a'}, {'confirm': 'same:pw'})
+        self.assertTrue(validator.valid())
+        self.assertFalse(validator.update({'pw': 'b'}))
+        self.assertEqual(validator.errors(), {'confirm': ['Field confirm does not match']})
+
+    def test_first_update_checks_every_field(self):
+        validator = Validator(self.data, self.rules, profile=True)
+        validator.valid()
+        self.assertFalse(validator.update({'end': 0}))
+        self.assertEqual(validator.stats()['fields']['name']['calls'], 4)
+        self.assertSameAsNew(validator)
+
+    def test_update_before_valid(self):
+        validator = Validator(self.data, self.rules)
+        self.assertFalse(validator.update({'name': ''}))
+        self.assertEqual(validator.errors(), {'name': ['Field name is required']})
+
+    def test_stop_on_first_error(self):
+        validator = Validator(self.data, self.rules, stop_on_first_error=True)
+        self.assertTrue(validator.valid())
+        self.assertFalse(validator.update({'name': '', 'email': ''}))
+        self.assertEqual(validator.errors(), {'name': ['Field name is required']})
+
+    def test_coerce(self):
+        validator = Validator({'a': '1', 'b': '2'}, {'a': 'numeric', 'b': 'numeric'}, coerce=True)
+        self.assertTrue(validator.valid())
+        self.assertTrue(validator.update({'b': '3.5'}))
+        self.assertEqual(validator.cleaned(), {'a': 1, 'b': 3.5})
+
+
+class CountedDivisibleField(DivisibleField):
+    __slots__ = ()
+
+    rule = 'counted_divisible'
+    cacheable = True
+    calls = []
+
+    def params(self):
+        return (self._divisor,)
+
+    def check(self, value, data):
+        self.calls.append(value)
+        return super(CountedDivisibleField, self).check(value, data)
+
+
+def counted_divisible(fieldname, rulevalue, message):
+    field = CountedDivisibleField(fieldname, message)
+    field._divisor = int(rulevalue)
+    return field
+
+
+class OddDivisibleField(CountedDivisibleField):
+    __slots__ = ()
+
+    def set_rule_value(self, rulevalue):
+        self._divisor = int(rulevalue)
+
+    def check(self, value, data):
+        return True if value % 2 and value % self._divisor == 0 else self._invoke_error()
+
+
+class RuleCacheTest(unittest.TestCase):
+    def setUp(self):
+        Validator.set_rule_cache_size(100)
+        self.addCleanup(Validator.clear_rule_cache)
+        self.addCleanup(Validator.set_rule_cache_size, 0)
+
+        Validator.register_rule('counted_divisible')(counted_divisible)
+        self.addCleanup(Validator._rule_factories.pop, 'counted_divisible')
+        del CountedDivisibleField.calls[:]
+
+    def test_hits(self):
+        rules = {'email': 'required|email'}
+        for _ in range(3):
+            self.assertTrue(build_validator({'email': 'mail@mail.com'}, rules))
+        self.assertFalse(build_validator({'email': 'mail'}, rules))
+        info = Validator.rule_cache_info()
+        self.assertEqual((info['hits'], info['misses'], info['size']), (2, 2, 2))
+        self.assertEqual(info['hit_rate'], 0.5)
+
+    def test_same_results(self):
+        rules = {'email': 'email', 'age': 'numeric', 'items.*': 'numeric'}
+        messages = {'email.email': 'Bad email'}
+        data = {'email': 'mail', 'age': '1e3', 'items': ['1', 'x', 2]}
+        Validator.set_rule_cache_size(0)
+        expected = Validator(data, rules, messages)
+        expected.valid()
+
+        Validator.set_rule_cache_size(100)
+        for _ in range(2):
+            validator = Validator(data, rules, messages)
+            self.assertFalse(validator.valid())
+            self.assertEqual(validator.errors(), expected.errors())
+
+        records = [{'email': 'mail'}, {'email': 'mail@mail.com'}, {'email': 'mail'}]
+        self.assertEqual(Validator.validate_many(records, {'email': 'email'}, {'email.email': 'Bad email'}),
+                         ([False, True, False], {0: {'email': ['Bad email']}, 2: {'email': ['Bad email']}}))
+
+    def test_params(self):
+        self.assertTrue(build_validator({'a': 6}, {'a': 'counted_divisible:3'}))
+        self.assertTrue(build_validator({'a': 6}, {'a': 'counted_divisible:3'}))
+        self.assertFalse(build_validator({'a': 6}, {'a': 'counted_divisible:4'}))
+        self.assertEqual(CountedDivisibleField.calls, [6, 6])
+
+    def test_many_deduplicates(self):
+        records = [{'a': value} for value in (3, 4, 3, 3, 4, 5)]
+        valid, errors = Validator.validate_many(records, {'a': 'counted_divisible:3'})
+        self.assertEqual(valid, [True, False, True, True, False, False])
+        self.assertEqual(sorted(CountedDivisibleField.calls), [3, 4, 5])
+
+    def test_value_type(self):
+        self.assertTrue(build_validator({'a': 1}, {'a': 'counted_divisible:1'}))
+        self.assertTrue(build_validator({'a': True}, {'a': 'counted_divisible:1'}))
+        self.assertTrue(build_validator({'a': 1.0}, {'a': 'counted_divisible:1'}))
+        self.assertEqual(CountedDivisibleField.calls, [1, True, 1.0])
+
+    def test_implementations(self):
+        self.assertTrue(build_validator({'a': 6}, {'a': 'counted_divisible:3'}))
+        Validator.register_rule('counted_divisible')(OddDivisibleField.create)
+        self.assertFalse(build_validator({'a': 6}, {'a': 'counted_divisible:3'}))
+
+    def test_unhashable(self):
+        self.assertFalse(build_validator({'a': [1]}, {'a': 'numeric'}))
+        self.assertFalse(build_validator({'a': [1]}, {'a': 'numeric'}))
+        self.assertEqual(Validator.rule_cache_info()['size'], 0)
+
+    def test_eviction(self):
+        Validator.set_rule_cache_size(2)
+        for value in range(4):
+            build_validator({'a': value}, {'a': 'numeric'})
+        info = Validator.rule_cache_info()
+        self.assertEqual((info['size'], info['maxsize'], info['evictions']), (2, 2, 2))
+
+    def test_disabled(self):
+        Validator.set_rule_cache_size(0)
+        build_validator({'a': 6}, {'a': 'counted_divisible:3'})
+        build_validator({'a': 6}, {'a': 'counted_divisible:3'})
+        self.assertEqual(CountedDivisibleField.calls, [6, 6])
+        self.assertEqual(Validator.rule_cache_info()['size'], 0)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,90 @@
+import re
+import time
+
+from helpers import LRUCache
+
+
+IDENTIFIER_PATTERN = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+_backend = None
+
+
+def set_backend(backend):
+    global _backend
+    _backend = backend
+
+
+def get_backend():
+    if _backend is None:
+        raise RuntimeError('The "unique" rule needs a backend, set one with unique.set_backend()')
+    return _backend
+
+
+class UniqueBackend:
+    def existing(self, table, column, values):
+        raise NotImplementedError
+
+
+class MemoryBackend(UniqueBackend):
+    def __init__(self, tables=None):
+        self.tables = {}
+        for table, columns in (tables or {}).items():
+            for column, values in columns.items():
+                self.add(table, column, values)
+
+    def add(self, table, column, values):
+        self.tables.setdefault(table, {}).setdefault(column, set()).update(values)
+
+    def existing(self, table, column, values):
+        stored = self.tables.get(table, {}).get(column, set())
+        return {value for value in values if value in stored}
+
+
+class SQLiteBackend(UniqueBackend):
+    CHUNK_SIZE = 500
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def existing(self, table, column, values):
+        for name in (table, column):
+            if not IDENTIFIER_PATTERN.match(name):
+                raise ValueError('Invalid table or column name "%s" in the "unique" rule' % name)
+
+        values = list(values)
+        found = set()
+
+        for start in range(0, len(values), self.CHUNK_SIZE):
+            chunk = values[start:start + self.CHUNK_SIZE]
+            query = 'SELECT "%s" FROM "%s" WHERE "%s" IN (%s)' % (column, table, column, ', '.join('?' * len(chunk)))
+            found.update(row[0] for row in self.connection.execute(query, chunk))
+
+        return found
+
+
+class CachedBackend(UniqueBackend):
+    def __init__(self, backend, ttl=60.0, maxsize=100000):
+        self.backend = backend
+        self.ttl = ttl
+        self.cache = LRUCache(maxsize)
+
+    def existing(self, table, column, values):
+        now = time.monotonic()
+        found = set()
+        missing = []
+
+        # only values known to exist are cached, anything else is looked up again
+        for value in values:
+            expires = self.cache.get((table, column, value))
+            if expires is not None and expires > now:
+                found.add(value)
+            else:
+                missing.append(value)
+
+        if missing:
+            expires = now + self.ttl
+            for value in self.backend.existing(table, column, missing):
+                self.cache.put((table, column, value), expires)
+                found.add(value)
+
+        return found
@@ -1,4 +1,19 @@
+import asyncio
+from functools import partial
+from itertools import repeat
+from time import perf_counter
+
 from fields import *
+from helpers import LRUCache, Path, assign
+import profiling
+import unique
+import vectorized
+
+
+PARSE_CACHE_SIZE = 1024
+
+_parse_cache = LRUCache(PARSE_CACHE_SIZE)
+_rule_cache = LRUCache(0)
 
 
 class Validator:
@@ -14,122 +29,571 @@ class Validator:
     RULE_LTE = 'lte'
     RULE_GT = 'gt'
     RULE_GTE = 'gte'
+    RULE_BAIL = 'bail'
+    RULE_CALLBACK = 'callback'
+    RULE_UNIQUE = 'unique'
+
+    _rule_factories = RULE_FACTORIES
+
+    # set on a validator only once profiling, update() or coerce needs them,
+    # so a plain validator stays small
+    profiler = None
+    _results = None
+    _coerced = None
+
+    @classmethod
+    def _is_valid_rule(cls, rule, rulevalue=None):
+        return rule in cls._rule_factories or rule == cls.RULE_BAIL \
+            or rule == cls.RULE_CALLBACK and callable(rulevalue)
+
+    @classmethod
+    def register_rule(cls, name):
+        def decorator(factory):
+            # a field class is registered through its create(), anything else
+            # is called as factory(fieldname, rulevalue, message)
+            if isinstance(factory, type):
+                # a class named after another rule (a built-in it extends, say)
+                # is registered as a subclass reported under the new name
+                fieldclass = factory
+                if fieldclass.rule != name:
+                    fieldclass = type(factory.__name__, (factory,), {'__slots__': (), 'rule': name})
+                cls._rule_factories[name] = fieldclass.create
+            else:
+                cls._rule_factories[name] = factory
+            return factory
+
+        return decorator
 
     @classmethod
-    def _is_valid_rule(cls, rule):
-        return hasattr(cls, 'RULE_%s' % rule.upper())
+    def compile(cls, rules, messages={}):
+        return Schema(rules, messages)
 
-    def __init__(self, data_dict, rules, messages={}):
+    @classmethod
+    def set_parse_cache_size(cls, size):
+        _parse_cache.resize(size)
+
+    @classmethod
+    def parse_cache_info(cls):
+        return _parse_cache.info()
+
+    @classmethod
+    def set_rule_cache_size(cls, size):
+        _rule_cache.resize(size)
+
+    @classmethod
+    def rule_cache_info(cls):
+        return _rule_cache.info()
+
+    @classmethod
+    def clear_rule_cache(cls):
+        _rule_cache.clear()
+
+    @classmethod
+    def set_unique_backend(cls, backend):
+        unique.set_backend(backend)
+
+    @classmethod
+    def set_profiler(cls, profiler):
+        profiling.set_profiler(profiler)
+
+    def __init__(self, data_dict, rules, messages={}, bail=False, stop_on_first_error=False, profile=False,
+                 coerce=False):
+        schema = rules if isinstance(rules, Schema) else Schema(rules, messages)
+
+        self.schema = schema
         self.data = data_dict
-        self.rules = rules
-        self.messages = messages.copy()
+        self.bail = bail
+        self.stop_on_first_error = stop_on_first_error
+        self.coerce = coerce
+        self.rules = schema.rules
+        self.messages = schema.messages
         self._errors = {}
-        self.fields = {}
+        if profile:
+            self.profiler = profiling.Profiler()
+        # the rule fields hold no values, every validator of a schema shares them
+        self.fields = schema.rule_fields
 
-        for fieldname, msg in messages.items():
-            parts = fieldname.split('.')
-            field = parts[0]
-            rule = parts[1]
+    @classmethod
+    def validate_many(cls, records, rules, messages={}, bail=False, vectorize=True):
+        schema = rules if isinstance(rules, Schema) else Schema(rules, messages)
+        records = records if isinstance(records, list) else list(records)
+        valid = [True] * len(records)
+        errors = {}
+        columns = {}
+        resolved = {}
+        arrays = {}
 
-            if field not in self.messages:
-                self.messages[field] = {}
+        def column_of(name):
+            if name not in columns:
+                path = schema.paths[name] if name in schema.paths else Path(name)
+                columns[name] = [path.get(record) for record in records]
+            return columns[name]
 
-            self.messages[field][rule] = msg
+        def resolved_of(name, active):
+            # the other field of a comparison is resolved once for all records,
+            # or only for the rows still checked once bail has dropped some
+            path = schema.paths[name] if name in schema.paths else Path(name)
+            if active is not None:
+                if name in resolved:
+                    return [resolved[name][index] for index in active]
+                return [path.resolve(records[index]) for index in active]
 
-        for fieldname, _rules in rules.items():
-            _rules = str(_rules).strip()
-            ruleparts = _rules.split('|')
+            if name not in resolved:
+                resolved[name] = [path.resolve(record) for record in records]
+            return resolved[name]
 
-            for rule in ruleparts:
-                rule = rule.strip()
-                rulevalue = ''
+        def array_of(name, column):
+            if name not in arrays:
+                arrays[name] = vectorized.as_array(column)
+            return arrays[name]
+
+        for fieldname, fieldlist in schema.rule_fields.items():
+            path = schema.paths[fieldname]
+            fieldbail = bail or fieldname in schema.bail
+
+            # values under a wildcard are flattened into one column over all
+            # records, owners maps each of them back to its row and name
+            if path.wildcard:
+                owners = []
+                values = []
+                rows = []
+                for index, record in enumerate(records):
+                    for name, value in path.expand(record):
+                        owners.append((index, name))
+                        values.append(value)
+                        rows.append(record)
+            else:
+                owners = None
+                values = column_of(fieldname)
+                rows = records
+
+            # with bail a position that failed a rule is left out of the rest
+            active = None
+            column = values
+            activerows = rows
+            for field in fieldlist:
+                if active is not None and not active:
+                    break
+
+                array = otherarray = othercolumn = None
+
+                if owners is None and isinstance(field, COMPARISON_FIELDS):
+                    othercolumn = resolved_of(field.get_value(), active)
+
+                if vectorize and vectorized.supports(field):
+                    if active is None:
+                        array = array_of(fieldname, values)
+                        if array is not None and othercolumn is not None:
+                            otherarray = array_of(field.get_value(), othercolumn)
+                    else:
+                        array = vectorized.take(array_of(fieldname, values), active)
+                        if array is not None and othercolumn is not None:
+                            otherarray = vectorized.as_array(othercolumn)
 
-                if rule:
-                    if rule.find(':') > -1:
-                        ruleparts = rule.split(':')
-                        rule = ruleparts[0].strip()
-                        rulevalue = ruleparts[1].strip()
-
-                    if not Validator._is_valid_rule(rule):
-                        continue
-
-                    message = None
-                    if fieldname in self.messages and rule in self.messages[fieldname]:
-                        message = self.messages[fieldname][rule]
-
-                    value = None
-                    if fieldname in self.data:
-                        value = self.data[fieldname]
-
-                    if fieldname not in self.fields:
-                        self.fields[fieldname] = []
-
-                    if rule == Validator.RULE_REQUIRED:
-                        self.fields[fieldname].append(RequiredField(fieldname, value, message))
-                    elif rule == Validator.RULE_EMAIL:
-                        self.fields[fieldname].append(EmailField(fieldname, value, message))
-                    elif rule == Validator.RULE_NUMERIC:
-                        self.fields[fieldname].append(NumericField(fieldname, value, message))
-                    elif rule == Validator.RULE_IN:
-                        enumvalues = rulevalue.replace(' ', '').split(',')
-
-                        enumfield = InField(fieldname, value, message)
-                        enumfield.set_values(enumvalues)
-
-                        self.fields[fieldname].append(enumfield)
-                    elif rule == Validator.RULE_MAX:
-                        maxfield = MaxField(fieldname, value, message)
-                        maxfield.set_value(rulevalue)
-
-                        self.fields[fieldname].append(maxfield)
-                    elif rule == Validator.RULE_MIN:
-                        minfield = MinField(fieldname, value, message)
-                        minfield.set_value(rulevalue)
-
-                        self.fields[fieldname].append(minfield)
-                    elif rule == Validator.RULE_NOT_IN:
-                        enumvalues = rulevalue.replace(' ', '').split(',')
-
-                        enumfield = NotInField(fieldname, value, message)
-                        enumfield.set_values(enumvalues)
-
-                        self.fields[fieldname].append(enumfield)
-                    elif rule == Validator.RULE_BOOLEAN:
-                        self.fields[fieldname].append(BooleanField(fieldname, value, message))
-                    elif rule == Validator.RULE_LT:
-                        lessthanfield = LessThanField(fieldname, value, message, self)
-                        lessthanfield.set_value(rulevalue)
-
-                        self.fields[fieldname].append(lessthanfield)
-                    elif rule == Validator.RULE_LTE:
-                        lessthaneqfield = LessThanEqualField(fieldname, value, message, self)
-                        lessthaneqfield.set_value(rulevalue)
-
-                        self.fields[fieldname].append(lessthaneqfield)
-                    elif rule == Validator.RULE_GT:
-                        greaterthanfield = GreaterThanField(fieldname, value, message, self)
-                        greaterthanfield.set_value(rulevalue)
-
-                        self.fields[fieldname].append(greaterthanfield)
-                    elif rule == Validator.RULE_GTE:
-                        greaterthaneqfield = GreaterThanEqualField(fieldname, value, message, self)
-                        greaterthaneqfield.set_value(rulevalue)
-
-                        self.fields[fieldname].append(greaterthaneqfield)
+                failed = cls._column_failures(field, column, activerows, array, otherarray, othercolumn)
+                if active is not None:
+                    failed = [(active[position], check) for position, check in failed]
+                if not failed:
+                    continue
+
+                if fieldbail:
+                    rejected = {position for position, _ in failed}
+                    active = [position for position in (active or range(len(values))) if position not in rejected]
+                    column = [values[position] for position in active]
+                    activerows = [rows[position] for position in active]
+
+                if owners is None:
+                    failed = [(index, fieldname, check) for index, check in failed]
+                else:
+                    failed = [owners[position] + (check,) for position, check in failed]
+                    failed = cls._rename_errors(failed, field)
+
+                for index, name, check in failed:
+                    valid[index] = False
+                    errors.setdefault(index, {}).setdefault(name, []).append(check)
+
+        return valid, errors
+
+    @classmethod
+    def _column_failures(cls, field, column, rows, array=None, otherarray=None, othercolumn=None):
+        mask = vectorized.mask(field, array, column, otherarray)
+        if mask is not None:
+            error = field._invoke_error()
+            return [(position, error) for position in vectorized.failures(mask)]
+
+        if othercolumn is not None:
+            checks = field.check_column(column, rows, othercolumn)
+        elif field.cacheable and _rule_cache.maxsize > 0:
+            checks = cls._cached_column(field, column, rows)
+        else:
+            checks = field.check_column(column, rows)
+        return [(position, check) for position, check in enumerate(checks) if check is not True]
+
+    @classmethod
+    def _rename_errors(cls, failed, field):
+        # a wildcard column is checked by one field named after the pattern,
+        # its default message is rendered again for each concrete name
+        renamed = []
+        messages = {}
+        error = field._invoke_error()
+
+        for index, name, check in failed:
+            if check is error:
+                if name not in messages:
+                    messages[name] = field.error_for(name)
+                check = messages[name]
+
+            renamed.append((index, name, check))
+
+        return renamed
+
+    @classmethod
+    async def avalidate_many(cls, records, rules, messages={}, bail=False):
+        schema = rules if isinstance(rules, Schema) else Schema(rules, messages)
+        if not schema.is_async:
+            return cls.validate_many(records, schema, bail=bail)
+
+        validators = [cls(record, schema, bail=bail) for record in records]
+        valid = await asyncio.gather(*(validator.avalid() for validator in validators))
+        errors = {index: validator.errors() for index, validator in enumerate(validators) if validator.errors()}
+
+        return list(valid), errors
+
+    @staticmethod
+    def _make_field(fieldname, rule, rulevalue, message):
+        if rule == Validator.RULE_CALLBACK and callable(rulevalue):
+            return CallbackField.create(fieldname, rulevalue, message)
+        return Validator._rule_factories[rule](fieldname, rulevalue, message)
 
     def valid(self):
+        return self._validate(self.fields)
+
+    def update(self, changed_data):
+        if self.schema.is_async:
+            raise TypeError('Validators with async rules cannot be updated, build a new one and use avalid()')
+
+        data = dict(self.data)
+        data.update(changed_data)
+        self.data = data
+
+        if self.stop_on_first_error:
+            self._errors = {}
+            self._coerced = None
+            return self.valid()
+
+        # the first update checks every field to record its results, later ones
+        # keep those of fields neither changed nor compared with a changed field
+        if self._results is None:
+            self._results = {}
+
+        affected = self.schema.affected(changed_data)
+        fieldnames = [fieldname for fieldname in self.fields if fieldname in affected or fieldname not in self._results]
+        if self._coerced:
+            for fieldname in fieldnames:
+                self._coerced.pop(fieldname, None)
+
+        self._validate(fieldnames)
+
+        self._errors = {}
+        for fieldname in self.fields:
+            for name, errors in self._results.get(fieldname, {}).items():
+                self._errors.setdefault(name, []).extend(errors)
+
+        return not self._errors
+
+    def _validate(self, fieldnames):
+        if self.profiler is None and profiling.collector is None:
+            return self._valid(fieldnames, self._field_validator())
+
+        samples = {}
+        try:
+            return self._valid(fieldnames, partial(self._instrumented_field, samples=samples))
+        finally:
+            for profiler in (self.profiler, profiling.collector):
+                if profiler is not None:
+                    profiler.add(samples)
+
+    def cleaned(self):
+        cleaned = dict(self.data)
+        copied = set()
+
+        # converted values are kept per field, under the names they were found at
+        for coerced in (self._coerced or {}).values():
+            for name, value in coerced.items():
+                if '.' not in name:
+                    cleaned[name] = value
+                else:
+                    assign(cleaned, name.split('.'), value, copied)
+
+        return cleaned
+
+    def stats(self):
+        return (self.profiler or profiling.Profiler()).stats()
+
+    def _valid(self, fieldnames, validate_field):
         valid = True
 
+        for fieldname in fieldnames:
+            errors = validate_field(fieldname, self.fields[fieldname])
+            if self._results is not None:
+                self._results[fieldname] = errors
+            if errors:
+                valid = False
+                for name, fielderrors in errors.items():
+                    self._errors.setdefault(name, []).extend(fielderrors)
+
+                if self.stop_on_first_error:
+                    return False
+
+        return valid
+
+    async def avalid(self):
+        if not self.schema.is_async:
+            return self.valid()
+
+        results = {}
+        asyncfields = []
+        validate_field = self._field_validator()
         for fieldname, fieldlist in self.fields.items():
+            if any(field.is_async for field in fieldlist):
+                asyncfields.append(fieldname)
+                continue
+
+            results[fieldname] = validate_field(fieldname, fieldlist)
+            if results[fieldname] and self.stop_on_first_error:
+                self._errors.update(results[fieldname])
+                return False
+
+        tasks = {asyncio.ensure_future(self._avalidate_field(fieldname, self.fields[fieldname])): fieldname
+                 for fieldname in asyncfields}
+
+        if self.stop_on_first_error:
+            while tasks:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    tasks.pop(task)
+                    if task.result():
+                        for pending in tasks:
+                            pending.cancel()
+                        self._errors.update(task.result())
+                        return False
+            return True
+
+        for task, errors in zip(tasks, await asyncio.gather(*tasks)):
+            results[tasks[task]] = errors
+
+        valid = True
+        for fieldname in self.fields:
+            for name, errors in results[fieldname].items():
+                valid = False
+                self._errors.setdefault(name, []).extend(errors)
+
+        return valid
+
+    def _validate_field(self, fieldname, fieldlist):
+        path = self.schema.paths[fieldname]
+        if path.wildcard:
+            return self._validate_wildcard(fieldname, fieldlist, path.expand(self.data))
+
+        bail = self.bail or self.stop_on_first_error or fieldname in self.schema.bail
+        value = path.get(self.data)
+        errors = []
+
+        for field in fieldlist:
+            check = field.check(value, self.data)
+            if check is not True:
+                errors.append(check)
+                if bail:
+                    break
+
+        return {fieldname: errors} if errors else {}
+
+    def _field_validator(self):
+        if self.coerce or _rule_cache.maxsize > 0:
+            return self._instrumented_field
+        return self._validate_field
+
+    def _instrumented_field(self, fieldname, fieldlist, samples=None):
+        path = self.schema.paths[fieldname]
+        if path.wildcard:
+            return self._validate_wildcard(fieldname, fieldlist, path.expand(self.data), samples)
+
+        bail = self.bail or self.stop_on_first_error or fieldname in self.schema.bail
+        value = path.get(self.data)
+        errors = []
+
+        for field in fieldlist:
+            if samples is None:
+                check = self._check(fieldname, field, value)
+            else:
+                start = perf_counter()
+                check = self._check(fieldname, field, value)
+                profiling.record(samples, fieldname, field.rule, 1, check is not True, perf_counter() - start)
+
+            if check is not True:
+                errors.append(check)
+                if bail:
+                    break
+
+        return {fieldname: errors} if errors else {}
+
+    def _check(self, fieldname, field, value, name=None):
+        if self.coerce and field.coerces:
+            check, converted = field.check_coerce(value, self.data)
+            if check is True and converted is not value:
+                self._coerced_values(fieldname)[name or fieldname] = converted
+            return check
+        elif field.cacheable and _rule_cache.maxsize > 0:
+            return Validator._cached_check(field, value, self.data)
+
+        return field.check(value, self.data)
+
+    @classmethod
+    def _cached_column(cls, field, column, rows):
+        # values repeated within the column are looked up in the shared cache once
+        seen = {}
+        checks = []
+
+        for value, data in zip(column, rows):
+            try:
+                key = (type(value), value)
+                check = seen.get(key)
+            except TypeError:
+                checks.append(field.check(value, data))
+                continue
+
+            if check is None:
+                check = seen[key] = cls._cached_check(field, value, data)
+            checks.append(check)
+
+        return checks
+
+    @classmethod
+    def _cached_check(cls, field, value, data):
+        # the outcome is kept, the message comes from the field that asks
+        try:
+            key = (type(field), field.rule, field.params(), type(value), value)
+            outcome = _rule_cache.get(key)
+        except TypeError:
+            return field.check(value, data)
+
+        if outcome is not None:
+            return True if outcome else field._invoke_error()
+
+        check = field.check(value, data)
+        if check is True or check is field._invoke_error():
+            _rule_cache.put(key, check is True)
+        return check
+
+    def _validate_wildcard(self, fieldname, fieldlist, expanded, samples=None):
+        if self.stop_on_first_error:
+            return self._first_wildcard_error(fieldname, fieldlist, expanded, samples)
+
+        bail = self.bail or fieldname in self.schema.bail
+        values = [value for _, value in expanded]
+        active = list(range(len(values)))
+        array = None
+        failed = []
+
+        # every rule runs once over the items still being checked, bail drops
+        # an item from the rest of the rules as soon as one of them fails
+        for field in fieldlist:
+            if not active:
+                break
+
+            if len(active) == len(values):
+                column = values
+            else:
+                column = [values[index] for index in active]
+
+            if samples is not None:
+                start = perf_counter()
+            columnarray = None
+            if vectorized.supports(field):
+                if array is None:
+                    array = vectorized.as_array(values)
+                columnarray = array if len(active) == len(values) else vectorized.take(array, active)
+
+            if self.coerce and field.coerces:
+                failures = self._coerce_column(field, column, [expanded[index][0] for index in active],
+                                               self._coerced_values(fieldname))
+            else:
+                failures = Validator._column_failures(field, column, repeat(self.data), columnarray)
+            if samples is not None:
+                profiling.record(samples, fieldname, field.rule, len(column), len(failures), perf_counter() - start)
+            if not failures:
+                continue
+
+            rulefailed = [(active[position], expanded[active[position]][0], check) for position, check in failures]
+            failed.extend(Validator._rename_errors(rulefailed, field))
+
+            if bail:
+                rejected = {index for index, _, _ in rulefailed}
+                active = [index for index in active if index not in rejected]
+
+        failed.sort(key=lambda failure: failure[0])
+
+        errors = {}
+        for _, name, check in failed:
+            errors.setdefault(name, []).append(check)
+
+        return errors
+
+    def _first_wildcard_error(self, fieldname, fieldlist, expanded, samples=None):
+        # item by item, so no rule reaches the items after the first failing one
+        for name, value in expanded:
             for field in fieldlist:
-                check = field.validate()
+                if samples is None:
+                    check = self._check(fieldname, field, value, name)
+                else:
+                    start = perf_counter()
+                    check = self._check(fieldname, field, value, name)
+                    profiling.record(samples, fieldname, field.rule, 1, check is not True, perf_counter() - start)
+
                 if check is not True:
-                    valid = False
-                    if fieldname not in self._errors:
-                        self._errors[fieldname] = []
-                    self._errors[fieldname].append(check)
+                    if check is field._invoke_error():
+                        check = field.error_for(name)
+                    return {name: [check]}
 
-        return valid
+        return {}
+
+    def _coerced_values(self, fieldname):
+        if self._coerced is None:
+            self._coerced = {}
+        return self._coerced.setdefault(fieldname, {})
+
+    def _coerce_column(self, field, column, names, coerced):
+        failures = []
+        for position, value in enumerate(column):
+            check, converted = field.check_coerce(value, self.data)
+            if check is not True:
+                failures.append((position, check))
+            elif converted is not value:
+                coerced[names[position]] = converted
+
+        return failures
+
+    async def _avalidate_field(self, fieldname, fieldlist):
+        bail = self.bail or self.stop_on_first_error or fieldname in self.schema.bail
+        path = self.schema.paths[fieldname]
+        items = path.expand(self.data) if path.wildcard else ((fieldname, path.get(self.data)),)
+        errors = {}
+
+        # fields with async rules are checked item by item
+        for name, value in items:
+            for field in fieldlist:
+                check = await field.acheck(value, self.data) if field.is_async else field.check(value, self.data)
+                if check is not True:
+                    if check is field._invoke_error():
+                        check = field.error_for(name)
+                    errors.setdefault(name, []).append(check)
+
+                    if self.stop_on_first_error:
+                        return errors
+                    if bail:
+                        break
+
+        return errors
 
     def errors(self, compact=False):
         if compact:
@@ -141,3 +605,112 @@ class Validator:
             return msgs
         else:
             return self._errors
+
+
+class Schema:
+    def __init__(self, rules, messages={}):
+        self.rules = rules
+        self.messages = messages.copy()
+
+        for fieldname, msg in messages.items():
+            field, rule = fieldname.rsplit('.', 1)
+
+            if field not in self.messages:
+                self.messages[field] = {}
+
+            self.messages[field][rule] = msg
+
+        fields = []
+        bail = set()
+        for fieldname, _rules in rules.items():
+            specs = []
+
+            for rule, rulevalue in Schema._parse_rules(_rules):
+                if rule == Validator.RULE_BAIL:
+                    bail.add(fieldname)
+                    continue
+                elif not Validator._is_valid_rule(rule, rulevalue):
+                    continue
+
+                message = None
+                if fieldname in self.messages and rule in self.messages[fieldname]:
+                    message = self.messages[fieldname][rule]
+
+                specs.append((rule, rulevalue, message))
+
+            if specs:
+                fields.append((fieldname, tuple(specs)))
+
+        self.fields = tuple(fields)
+        self.paths = {fieldname: Path(fieldname) for fieldname, _ in self.fields}
+        self.bail = frozenset(bail)
+        self.rule_fields = {fieldname: [Validator._make_field(fieldname, rule, rulevalue, message)
+                                        for rule, rulevalue, message in specs]
+                            for fieldname, specs in self.fields}
+        self.is_async = any(field.is_async for fieldlist in self.rule_fields.values() for field in fieldlist)
+
+        # a field depends on the top-level key it is found under and on those
+        # of the fields it is compared with; callbacks and registered rules
+        # may read any key
+        self.dependents = {}
+        volatile = set()
+        for fieldname, fieldlist in self.rule_fields.items():
+            self.dependents.setdefault(self.paths[fieldname].segments[0], set()).add(fieldname)
+            for field in fieldlist:
+                if isinstance(field, CallbackField) or type(field) is not BUILTIN_FIELDS.get(field.rule):
+                    volatile.add(fieldname)
+                elif isinstance(field, COMPARISON_FIELDS):
+                    self.dependents.setdefault(Path(field.get_value()).segments[0], set()).add(fieldname)
+        self.volatile = frozenset(volatile)
+
+    @staticmethod
+    def _parse_rules(_rules):
+        if isinstance(_rules, (list, tuple)):
+            return Schema._parse_tokens(_rules)
+
+        _rules = str(_rules).strip()
+        parsed = _parse_cache.get(_rules)
+        if parsed is None:
+            parsed = Schema._parse_tokens(_rules.split('|'))
+            _parse_cache.put(_rules, parsed)
+
+        return parsed
+
+    @staticmethod
+    def _parse_tokens(tokens):
+        parsed = []
+        for rule in tokens:
+            if callable(rule):
+                rule, rulevalue = Validator.RULE_CALLBACK, rule
+            elif isinstance(rule, tuple):
+                rule, rulevalue = rule[0].strip(), rule[1]
+            else:
+                rule = rule.strip()
+                rulevalue = ''
+
+                if rule.find(':') > -1:
+                    ruleparts = rule.split(':')
+                    rule = ruleparts[0].strip()
+                    rulevalue = ruleparts[1].strip()
+
+                if rule in (Validator.RULE_IN, Validator.RULE_NOT_IN):
+                    rulevalue = tuple(rulevalue.replace(' ', '').split(','))
+
+            if rule:
+                parsed.append((rule, rulevalue))
+
+        return tuple(parsed)
+
+    def affected(self, changed_data):
+        affected = set(self.volatile)
+        for key in changed_data:
+            affected.update(self.dependents.get(key, ()))
+
+        return affected
+
+    def validate(self, data_dict, bail=False, stop_on_first_error=False, profile=False, coerce=False):
+        return Validator(data_dict, self, bail=bail, stop_on_first_error=stop_on_first_error, profile=profile,
+                         coerce=coerce)
+
+
+register_rule = Validator.register_rule
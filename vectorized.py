@@ -0,0 +1,119 @@
+from fields import NumericField, MaxField, MinField, InField, NotInField, \
+    LessThanField, LessThanEqualField, GreaterThanField, GreaterThanEqualField
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+def as_array(values):
+    if np is None or not values:
+        return None
+
+    types = set(map(type, values))
+    if types == {int}:
+        try:
+            return np.array(values, dtype=np.int64)
+        except OverflowError:
+            return None
+    elif types == {float}:
+        return np.array(values, dtype=np.float64)
+
+    return None
+
+
+def take(array, positions):
+    if array is None:
+        return None
+    return array[positions]
+
+
+def supports(field):
+    return np is not None and type(field) in _MASKS
+
+
+def is_cross_field(field):
+    return type(field) in _CROSS_FIELD_MASKS
+
+
+def mask(field, array, values, otherarray=None):
+    if array is None:
+        return None
+
+    if is_cross_field(field):
+        if otherarray is None:
+            return None
+        return _CROSS_FIELD_MASKS[type(field)](array, otherarray)
+
+    return _MASKS[type(field)](field, array, values)
+
+
+def failures(mask):
+    return np.flatnonzero(~mask).tolist()
+
+
+def _numeric(field, array, values):
+    if array.dtype.kind != 'f':
+        return np.ones(len(array), dtype=bool)
+
+    # floats outside this range are printed in exponent notation, which the
+    # numeric pattern only partly accepts, so those go through the field itself
+    magnitude = np.abs(array)
+    result = np.isfinite(array) & (magnitude >= 1e-4) & (magnitude < 1e16) | (array == 0)
+
+    for index in np.flatnonzero(~result).tolist():
+        result[index] = field.check(values[index], None) is True
+
+    return result
+
+
+def _max(field, array, values):
+    return array <= field.get_value()
+
+
+def _min(field, array, values):
+    return array >= field.get_value()
+
+
+def _membership(enum, array):
+    if array.dtype.kind != 'f':
+        return np.isin(array, list(enum.ints))
+
+    # zeros and NaN are not kept in the typed floats, see EnumValues
+    result = np.isin(array, list(enum.floats))
+
+    if 'nan' in enum.strings:
+        result |= np.isnan(array)
+    if '0.0' in enum.strings:
+        result |= (array == 0) & ~np.signbit(array)
+    if '-0.0' in enum.strings:
+        result |= (array == 0) & np.signbit(array)
+
+    return result
+
+
+def _in(field, array, values):
+    return _membership(field.get_enum(), array)
+
+
+def _not_in(field, array, values):
+    return ~_membership(field.get_enum(), array)
+
+
+_MASKS = {
+    NumericField: _numeric,
+    MaxField: _max,
+    MinField: _min,
+    InField: _in,
+    NotInField: _not_in,
+}
+
+_CROSS_FIELD_MASKS = {
+    LessThanField: lambda array, otherarray: array < otherarray,
+    LessThanEqualField: lambda array, otherarray: array <= otherarray,
+    GreaterThanField: lambda array, otherarray: array > otherarray,
+    GreaterThanEqualField: lambda array, otherarray: array >= otherarray,
+}
+
+_MASKS.update(dict.fromkeys(_CROSS_FIELD_MASKS))